@@ -0,0 +1,435 @@
+# benchmark.py
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import re
+import resource
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from email.utils import format_datetime
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from news_scraper import NewsScraper
+from news_sources import NEWS_SOURCES
+
+logger = logging.getLogger(__name__)
+
+# Vocabulary for synthetic article bodies
+WORDS = (
+    'government minister election vote parliament economy market shares inflation rate bank '
+    'central growth report said officials according statement week year month people city '
+    'country region border talks agreement summit leaders president policy climate energy '
+    'prices oil gas supply trade tariffs exports companies workers union strike court ruling '
+    'judge law police investigation attack security military forces ceasefire aid crisis '
+    'hospital health vaccine study scientists research data technology industry investors '
+    'analysts expected announced plans new first last major public local national international'
+).split()
+
+SIMPLE_SELECTOR = re.compile(
+    r'^(?P<tag>[a-zA-Z][\w-]*)?(?P<classes>(?:\.[\w-]+)*)'
+    r'(?:\[(?P<attr>[\w-]+)[*^$~|]?="(?P<value>[^"]*)"\])?$'
+)
+ARTICLE_PATH = re.compile(r'(\d{4})-(\d{2})-(\d{2})/story-(\d+)$')
+ARCHIVE_DATE = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+DEFAULT_ARCHIVE_PATH = '/archive/{year}-{month:02d}-{day:02d}'
+
+
+def element_for(selector: str) -> Tuple[str, str]:
+    """Opening and closing tag of an element the given simple CSS selector matches"""
+    match = SIMPLE_SELECTOR.match(selector.strip())
+    if not match:
+        return '<div>', '</div>'
+
+    tag = match.group('tag') or 'div'
+    classes = [name for name in match.group('classes').split('.') if name]
+    attrs = {}
+    if match.group('attr') == 'class':
+        classes.append(match.group('value'))
+    elif match.group('attr'):
+        attrs[match.group('attr')] = match.group('value')
+    if classes:
+        attrs['class'] = ' '.join(classes)
+
+    rendered = ''.join(f' {name}="{escape(value)}"' for name, value in attrs.items())
+    return f'<{tag}{rendered}>', f'</{tag}>'
+
+
+def link_prefix(source: Dict) -> str:
+    """Path fragment article links must contain, taken from a[href*="..."] style selectors"""
+    match = re.search(r'href[*^]?="([^"]+)"', source.get('selectors', {}).get('article_links', ''))
+    return match.group(1) if match else '/article/'
+
+
+class SyntheticSite:
+    def __init__(self, source: Dict, settings: Dict):
+        """
+        Stand-in for one news site in a NEWS_SOURCES layout: front page,
+        archive pages, feed and article pages whose markup matches the
+        source's selectors. Pages are generated deterministically from the
+        URL, so every run serves the same content. Article pages are taken
+        from recorded HTML instead when settings['recorded_dir'] has some for
+        this source.
+        """
+        self.name = source['name']
+        self.selectors = source.get('selectors', {})
+        self.front_path = urlparse(source['url']).path or '/'
+        self.feed_path = urlparse(source['feed_url']).path if source.get('feed_url') else None
+        self.archive_path = urlparse(source['archive_url_pattern']).path if source.get('archive_url_pattern') else \
+            self.front_path.rstrip('/') + DEFAULT_ARCHIVE_PATH
+        self.archive_prefix = self.archive_path.split('{', 1)[0]
+        self.link_prefix = link_prefix(source)
+        self.settings = settings
+        self.recorded = self.load_recorded(settings.get('recorded_dir'))
+        self.boilerplate = self.build_boilerplate(settings.get('padding_kb', 0))
+
+    def load_recorded(self, recorded_dir: Optional[str]) -> List[bytes]:
+        """Saved article pages for this source (recorded_dir/<source slug>/*.html)"""
+        if not recorded_dir:
+            return []
+        directory = os.path.join(recorded_dir, re.sub(r'\W+', '_', self.name).strip('_').lower())
+        if not os.path.isdir(directory):
+            return []
+        pages = []
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith('.html'):
+                with open(os.path.join(directory, filename), 'rb') as f:
+                    pages.append(f.read())
+        return pages
+
+    def build_boilerplate(self, padding_kb: int) -> str:
+        """Navigation and inline script of roughly padding_kb, like the chrome around real articles"""
+        nav = ''.join(f'<li><a href="/section/{word}">{word.title()}</a></li>' for word in WORDS[:40])
+        script = 'var config = {};\n' * (padding_kb * 1024 // 17)
+        return f'<header><nav><ul>{nav}</ul></nav></header><script>{script}</script>'
+
+    def article_path(self, day: date, index: int) -> str:
+        return f"{self.link_prefix.rstrip('/')}/{day.isoformat()}/story-{index}"
+
+    def page(self, title: str, body: str) -> bytes:
+        return (f'<!DOCTYPE html><html><head><title>{escape(title)}</title></head>'
+                f'<body>{self.boilerplate}<main>{body}</main><footer><p>© {escape(self.name)}</p></footer>'
+                f'</body></html>').encode('utf-8')
+
+    def listing(self, title: str, day: date) -> bytes:
+        count = self.settings.get('articles_per_page', 20)
+        links = ''.join(f'<li><a href="{self.article_path(day, index)}">Story {index}</a></li>' for index in range(count))
+        return self.page(title, f'<h2>{escape(title)}</h2><ul>{links}</ul>')
+
+    def article(self, day: date, index: int) -> bytes:
+        if self.recorded:
+            return self.recorded[(day.toordinal() * 31 + index) % len(self.recorded)]
+
+        rng = random.Random(f'{self.name}/{day.isoformat()}/{index}')
+        paragraphs = ''.join(
+            '<p>' + ' '.join(rng.choice(WORDS) for _ in range(rng.randint(30, 70))).capitalize() + '.</p>'
+            for _ in range(self.settings.get('paragraphs', 8))
+        )
+        title = ' '.join(rng.choice(WORDS) for _ in range(8)).capitalize()
+
+        title_open, title_close = element_for(self.selectors.get('title', 'h1'))
+        content_selectors = self.selectors.get('content') or ['article']
+        if isinstance(content_selectors, str):
+            content_selectors = [content_selectors]
+        content_open, content_close = element_for(content_selectors[0])
+        return self.page(title, f'{title_open}{escape(title)}{title_close}{content_open}{paragraphs}{content_close}')
+
+    def feed(self, base_url: str, day: date) -> bytes:
+        items = []
+        for index in range(self.settings.get('articles_per_page', 20)):
+            published = datetime.combine(day, datetime.min.time()) + timedelta(minutes=index)
+            items.append(
+                f'<item><title>Story {index}</title><link>{base_url}{self.article_path(day, index)}</link>'
+                f'<description>Summary of story {index}</description>'
+                f'<pubDate>{format_datetime(published)}</pubDate></item>'
+            )
+        return (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+                f'<title>{escape(self.name)}</title>{"".join(items)}</channel></rss>').encode('utf-8')
+
+    def render(self, path: str, base_url: str) -> Tuple[int, str, bytes]:
+        """(status, content type, body) for a request path"""
+        path = path.split('?', 1)[0]
+        today = date.today()
+
+        if path == '/robots.txt':
+            return 200, 'text/plain', b'User-agent: *\nAllow: /\n'
+        if self.feed_path and path == self.feed_path:
+            return 200, 'application/rss+xml', self.feed(base_url, today)
+        if path == self.front_path:
+            return 200, 'text/html', self.listing(self.name, today)
+        if path.startswith(self.archive_prefix):
+            match = ARCHIVE_DATE.search(path, len(self.archive_prefix))
+            if match:
+                day = date(*(int(part) for part in match.groups()))
+                return 200, 'text/html', self.listing(f'{self.name} archive {day.isoformat()}', day)
+        if path.startswith(self.link_prefix.rstrip('/')):
+            match = ARTICLE_PATH.search(path)
+            if match:
+                year, month, day, index = (int(part) for part in match.groups())
+                return 200, 'text/html', self.article(date(year, month, day), index)
+        return 404, 'text/plain', b'Not found'
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    # Keep-alive, as the real sites allow
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        settings = server.site.settings
+
+        delay = settings.get('latency', 0.0) + random.uniform(0, settings.get('jitter', 0.0))
+        if delay > 0:
+            time.sleep(delay)
+
+        with server.counters['requests'].get_lock():
+            server.counters['requests'].value += 1
+        if random.random() < settings.get('error_rate', 0.0):
+            with server.counters['errors'].get_lock():
+                server.counters['errors'].value += 1
+            status, content_type, body = settings.get('error_status', 503), 'text/plain', b'Injected failure'
+        else:
+            status, content_type, body = server.site.render(self.path, f'http://{self.headers.get("Host")}')
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve_sites(sources: List[Dict], settings: Dict, counters: Dict, ready):
+    """Server process: one threaded HTTP server per source, ports reported on `ready`"""
+    random.seed(settings.get('seed'))
+    ports = []
+    for source in sources:
+        server = ThreadingHTTPServer(('127.0.0.1', 0), SiteHandler)
+        server.site = SyntheticSite(source, settings)
+        server.counters = counters
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        ports.append(server.server_address[1])
+    ready.put(ports)
+    threading.Event().wait()
+
+
+def local_source(source: Dict, port: int, settings: Dict) -> Dict:
+    """Copy of a source config pointed at its stand-in server"""
+    base_url = f'http://127.0.0.1:{port}'
+    site = SyntheticSite(source, {})
+    local = dict(
+        source,
+        base_url=base_url,
+        url=base_url + site.front_path,
+        archive_url_pattern=base_url + site.archive_path,
+        supports_archive=True,
+        max_articles=settings.get('articles_per_page', 20),
+        max_concurrency=settings.get('concurrency', 4),
+        # Politeness is measured separately; by default the hosts are not the bottleneck
+        rate_limit={'rate': settings.get('rate', 200.0), 'max_rate': settings.get('rate', 200.0),
+                    'burst': settings.get('concurrency', 4), 'respect_robots': False}
+    )
+    if site.feed_path:
+        local['feed_url'] = base_url + site.feed_path
+    return local
+
+
+def disk_usage(db_path: str) -> int:
+    return sum(os.path.getsize(path) for path in (db_path, db_path + '-wal') if os.path.exists(path))
+
+
+def run_benchmark(days: int = 0, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                  error_status: int = 503, articles_per_page: int = 20, paragraphs: int = 8,
+                  padding_kb: int = 50, concurrency: int = 4, rate: float = 200.0,
+                  parse_workers: Optional[int] = None, source_names: Optional[List[str]] = None,
+                  recorded_dir: Optional[str] = None, seed: int = 1, keep_dir: bool = False) -> Dict:
+    """
+    Run NewsScraper end to end against stand-in servers for NEWS_SOURCES and
+    measure it. days=0 collects the front pages/feeds only; days=N also
+    backfills the archives of the last N days.
+    """
+    settings = {
+        'latency': latency, 'jitter': jitter, 'error_rate': error_rate, 'error_status': error_status,
+        'articles_per_page': articles_per_page, 'paragraphs': paragraphs, 'padding_kb': padding_kb,
+        'concurrency': concurrency, 'rate': rate, 'recorded_dir': recorded_dir, 'seed': seed
+    }
+    sources = [source for source in NEWS_SOURCES if not source_names or source['name'] in source_names]
+    if not sources:
+        raise ValueError(f"No configured sources match {source_names}")
+
+    work_dir = tempfile.mkdtemp(prefix='news_benchmark_')
+    counters = {'requests': multiprocessing.Value('i', 0), 'errors': multiprocessing.Value('i', 0)}
+    ready = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve_sites, args=(sources, settings, counters, ready), daemon=True)
+    server.start()
+
+    scraper = None
+    try:
+        ports = ready.get(timeout=30)
+        db_path = os.path.join(work_dir, 'news_data.db')
+        # Enough fetch workers for every host to use its whole concurrency budget at once
+        scraper = NewsScraper(db_path=db_path, parse_workers=parse_workers,
+                              max_workers=max(16, concurrency * len(sources)),
+                              cache_path=os.path.join(work_dir, 'http_cache.db'))
+        scraper.news_sources = [local_source(source, port, settings) for source, port in zip(sources, ports)]
+        for source in scraper.news_sources:
+            scraper.fetch_engine.configure_host(source['base_url'], max_concurrency=concurrency,
+                                                rate_limit=source['rate_limit'], label=source['name'])
+
+        # Time spent inside the article store, to report the DB write rate on its own
+        write_time = [0.0]
+        insert_articles = scraper.store.insert_articles
+
+        def timed_insert(articles):
+            start = time.perf_counter()
+            try:
+                return insert_articles(articles)
+            finally:
+                write_time[0] += time.perf_counter() - start
+        scraper.store.insert_articles = timed_insert
+
+        self_before = resource.getrusage(resource.RUSAGE_SELF)
+        children_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+        started = time.perf_counter()
+
+        if days > 0:
+            now = datetime.now()
+            source_stats = scraper.collect_historical_data(now - timedelta(days=days), now)
+        else:
+            source_stats = scraper.collect_data_since_last_collection(initial_collection_days=1)
+
+        elapsed = time.perf_counter() - started
+        db_bytes = disk_usage(db_path)
+        # Parse workers only count toward RUSAGE_CHILDREN once they have exited
+        scraper.close()
+        scraper = None
+        self_after = resource.getrusage(resource.RUSAGE_SELF)
+        children_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    finally:
+        if scraper is not None:
+            scraper.close()
+        server.terminate()
+        server.join()
+        if not keep_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    articles = sum(source_stats.values())
+    scraper_cpu = (self_after.ru_utime + self_after.ru_stime) - (self_before.ru_utime + self_before.ru_stime)
+    worker_cpu = (children_after.ru_utime + children_after.ru_stime) - (children_before.ru_utime + children_before.ru_stime)
+
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'settings': dict(settings, days=days, sources=[source['name'] for source in sources]),
+        'articles': articles,
+        'by_source': source_stats,
+        'seconds': elapsed,
+        'articles_per_second': articles / elapsed if elapsed else 0.0,
+        'cpu_ms_per_article': (scraper_cpu + worker_cpu) * 1000 / articles if articles else 0.0,
+        'scraper_cpu_seconds': scraper_cpu,
+        'worker_cpu_seconds': worker_cpu,
+        # ru_maxrss is in kilobytes on Linux
+        'peak_rss_mb': self_after.ru_maxrss / 1024,
+        'worker_peak_rss_mb': children_after.ru_maxrss / 1024,
+        'db_write_seconds': write_time[0],
+        'db_rows_per_second': articles / write_time[0] if write_time[0] else 0.0,
+        'db_mb': db_bytes / (1024 * 1024),
+        'requests': counters['requests'].value,
+        'injected_errors': counters['errors'].value,
+        'work_dir': work_dir if keep_dir else None
+    }
+
+
+def print_report(result: Dict, baseline: Optional[Dict] = None):
+    """Summary of a benchmark run, with the change against a baseline run if given"""
+    def change(key: str) -> str:
+        if not baseline or not baseline.get(key):
+            return ''
+        return f"  ({(result[key] - baseline[key]) / baseline[key] * 100:+.1f}% vs baseline)"
+
+    settings = result['settings']
+    print("=" * 70)
+    print("CRAWLER BENCHMARK")
+    print("=" * 70)
+    print(f"Sources: {len(settings['sources'])} | Archive days: {settings['days']} | "
+          f"Latency: {settings['latency'] * 1000:.0f} ms (+{settings['jitter'] * 1000:.0f} ms jitter) | "
+          f"Injected errors: {settings['error_rate'] * 100:.1f}%")
+    print(f"Articles stored: {result['articles']} in {result['seconds']:.2f}s "
+          f"({result['requests']} requests, {result['injected_errors']} failed on purpose)")
+    print(f"  Throughput: {result['articles_per_second']:.1f} articles/s{change('articles_per_second')}")
+    print(f"  CPU per article: {result['cpu_ms_per_article']:.2f} ms{change('cpu_ms_per_article')}")
+    print(f"    scraper process {result['scraper_cpu_seconds']:.2f}s, parse workers {result['worker_cpu_seconds']:.2f}s")
+    print(f"  Peak RSS: {result['peak_rss_mb']:.1f} MB{change('peak_rss_mb')} "
+          f"(largest parse worker {result['worker_peak_rss_mb']:.1f} MB)")
+    print(f"  DB writes: {result['db_rows_per_second']:.0f} rows/s{change('db_rows_per_second')} "
+          f"({result['db_write_seconds']:.2f}s writing, {result['db_mb']:.2f} MB on disk)")
+    for source_name, count in result['by_source'].items():
+        print(f"    {source_name}: {count} articles")
+    print("=" * 70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure NewsScraper against local stand-in news sites")
+    parser.add_argument("--days", type=int, default=0, help="Also backfill this many archive days (default: front pages only)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=503, help="Status code of injected failures (default 503)")
+    parser.add_argument("--articles", type=int, default=20, help="Article links per front/archive page (default 20)")
+    parser.add_argument("--paragraphs", type=int, default=8, help="Paragraphs per synthetic article (default 8)")
+    parser.add_argument("--padding-kb", type=int, default=50, help="Boilerplate markup per article page (default 50 KB)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel requests per host (default 4)")
+    parser.add_argument("--rate", type=float, default=200.0, help="Requests per second allowed per host (default 200)")
+    parser.add_argument("--parse-workers", type=int, help="Parse processes (default: one per core)")
+    parser.add_argument("--source", action="append", dest="sources", help="Only this source (repeatable)")
+    parser.add_argument("--recorded", help="Directory of saved article pages, <dir>/<source_name>/*.html")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for latency and error injection")
+    parser.add_argument("--json", help="Append the result to this JSON lines file")
+    parser.add_argument("--baseline", help="Compare against the last result in this JSON lines file")
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark database")
+    parser.add_argument("--verbose", action="store_true", help="Keep the scraper's INFO logging")
+    options = parser.parse_args()
+
+    if not options.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    baseline = None
+    if options.baseline and os.path.exists(options.baseline):
+        with open(options.baseline, encoding='utf-8') as f:
+            lines = [line for line in f if line.strip()]
+        baseline = json.loads(lines[-1]) if lines else None
+
+    result = run_benchmark(
+        days=options.days,
+        latency=options.latency,
+        jitter=options.jitter,
+        error_rate=options.error_rate,
+        error_status=options.error_status,
+        articles_per_page=options.articles,
+        paragraphs=options.paragraphs,
+        padding_kb=options.padding_kb,
+        concurrency=options.concurrency,
+        rate=options.rate,
+        parse_workers=options.parse_workers,
+        source_names=options.sources,
+        recorded_dir=options.recorded,
+        seed=options.seed,
+        keep_dir=options.keep
+    )
+    print_report(result, baseline)
+
+    if options.json:
+        with open(options.json, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(result) + '\n')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# daemon.py
+import os
+import time
+import signal
+import logging
+import functools
+import threading
+from typing import Callable, Dict, List, Optional
+from news_scraper import DB_DIR, NewsScraper
+from db.data_organizer import NewsDataOrganizer
+
+logger = logging.getLogger(__name__)
+
+# flock is POSIX only; elsewhere runs are not protected against overlapping
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+LOCK_PATH = os.path.join(DB_DIR, "collector.lock")
+# Seconds between collections of a source, unless it sets 'poll_interval'
+DEFAULT_POLL_INTERVAL = 900
+# Longest a cycle keeps starting new backfill chunks before the scheduler takes over again
+DEFAULT_CYCLE_BUDGET = 600
+# Longest a forced exit waits for buffered articles to be written
+FLUSH_TIMEOUT = 10
+
+
+class CollectorLock:
+    def __init__(self, path: str = LOCK_PATH):
+        """
+        Single-instance lock shared by the daemon and the one-shot collection
+        commands, so a cron run never overlaps another collection. The lock
+        is an flock on a file holding the owner's pid and is released by the
+        kernel if the process dies.
+        """
+        self.path = path
+        self._file = None
+
+    def acquire(self) -> bool:
+        """Take the lock without waiting; False if another process holds it"""
+        if fcntl is None:
+            logger.warning("File locking is not available on this platform; overlapping runs are not prevented")
+            return True
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        lock_file = open(self.path, 'a+')
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._file = lock_file
+        return True
+
+    def holder(self) -> Optional[int]:
+        """Pid recorded by the current holder, if any"""
+        try:
+            with open(self.path) as f:
+                return int(f.read().strip() or 0) or None
+        except (OSError, ValueError):
+            return None
+
+    def release(self):
+        if self._file is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+def exclusive(func: Callable) -> Callable:
+    """Run a collection command only if no other collection holds the lock"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        lock = CollectorLock()
+        if not lock.acquire():
+            logger.error(f"Another collection is already running (pid {lock.holder()}), not starting {func.__name__}")
+            return None
+        try:
+            return func(*args, **kwargs)
+        finally:
+            lock.release()
+    return wrapper
+
+
+class CollectorDaemon:
+    def __init__(self, poll_interval: float = DEFAULT_POLL_INTERVAL, cycle_budget: float = DEFAULT_CYCLE_BUDGET,
+                 initial_collection_days: int = 365*10, organize: bool = True, output_format: str = 'txt',
+                 metrics_port: Optional[int] = None, lock_path: str = LOCK_PATH):
+        """
+        Long-running collector. One NewsScraper stays warm for the life of the
+        process (sessions, known URL index, compiled selectors, parse workers)
+        and an in-process scheduler collects each source every poll_interval
+        seconds (or its own 'poll_interval'). A source with backfill still
+        queued is rescheduled straight away, so archives keep filling in
+        budget-sized slices between the live polls of every other source.
+        SIGINT/SIGTERM finish the current chunk and exit cleanly; a second
+        signal exits immediately.
+        """
+        self.poll_interval = poll_interval
+        self.cycle_budget = cycle_budget
+        self.initial_collection_days = initial_collection_days
+        self.organize = organize
+        self.output_format = output_format
+        self.metrics_port = metrics_port
+        self.lock = CollectorLock(lock_path)
+        self.stop_event = threading.Event()
+        self.scraper: Optional[NewsScraper] = None
+        self.organizer: Optional[NewsDataOrganizer] = None
+
+    def handle_signal(self, signum, frame):
+        if self.stop_event.is_set():
+            # Second signal: exit now instead of unwinding through stages that may be stuck
+            # on a slow host. Buffered rows are written first, but only for FLUSH_TIMEOUT
+            # seconds; records still being parsed are lost. The kernel drops the lock.
+            logger.warning(f"Received {signal.Signals(signum).name} again, exiting without waiting for the current chunk")
+            if self.scraper is not None:
+                flusher = threading.Thread(target=self.flush_before_exit, name='exit-flush', daemon=True)
+                flusher.start()
+                flusher.join(FLUSH_TIMEOUT)
+            logging.shutdown()
+            os._exit(128 + signum)
+        logger.info(f"Received {signal.Signals(signum).name}, stopping after the current chunk...")
+        self.stop_event.set()
+
+    def flush_before_exit(self):
+        try:
+            logger.info(f"✓ Wrote {self.scraper.flush_writers()} buffered articles before exiting")
+        except Exception as e:
+            logger.error(f"Error writing buffered articles before exiting: {e}")
+
+    def interval_for(self, source: Dict) -> float:
+        return source.get('poll_interval', self.poll_interval)
+
+    def keep_going(self, deadline: float) -> bool:
+        return not self.stop_event.is_set() and time.monotonic() < deadline
+
+    def run_cycle(self, sources: List[Dict]):
+        """Collect the due sources, then export what was stored"""
+        names = ', '.join(source['name'] for source in sources)
+        logger.info(f"Collection cycle: {names}")
+        deadline = time.monotonic() + self.cycle_budget
+
+        try:
+            result = self.scraper.run_collection(
+                self.initial_collection_days,
+                sources=sources,
+                keep_going=lambda: self.keep_going(deadline)
+            )
+        except Exception as e:
+            logger.error(f"Error in collection cycle ({names}): {e}")
+            return
+
+        # Rows this cycle stored; the organizer's watermark picks up anything an earlier cycle left
+        if self.organize and sum(result['source_breakdown'].values()):
+            try:
+                organized = self.organizer.organize_all_data()
+                logger.info(f"✓ Organized {sum(organized.values())} articles")
+            except Exception as e:
+                logger.error(f"Error organizing collected data: {e}")
+
+    def run(self) -> bool:
+        """Run until SIGINT/SIGTERM; False if another collector already holds the lock"""
+        if not self.lock.acquire():
+            logger.error(f"Another collector is already running (pid {self.lock.holder()})")
+            return False
+
+        previous_handlers = {signum: signal.signal(signum, self.handle_signal) for signum in (signal.SIGINT, signal.SIGTERM)}
+        try:
+            self.scraper = NewsScraper(metrics_port=self.metrics_port)
+            if self.organize:
+                self.organizer = NewsDataOrganizer(output_format=self.output_format)
+            logger.info(f"Collector daemon started (pid {os.getpid()}) with {len(self.scraper.news_sources)} sources")
+
+            next_due = {source['name']: 0.0 for source in self.scraper.news_sources}
+            while not self.stop_event.is_set():
+                now = time.monotonic()
+                due = [source for source in self.scraper.news_sources if next_due[source['name']] <= now]
+                if not due:
+                    self.stop_event.wait(min(next_due.values()) - now)
+                    continue
+
+                self.run_cycle(due)
+
+                finished = time.monotonic()
+                for source in due:
+                    if self.scraper.backfill.earliest_open_day(source['name']):
+                        # Archive work left: keep going after the other due sources had their turn
+                        next_due[source['name']] = finished
+                    else:
+                        next_due[source['name']] = finished + self.interval_for(source)
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+            if self.scraper is not None:
+                self.scraper.close()
+            self.lock.release()
+            logger.info("Collector daemon stopped")
+        return True
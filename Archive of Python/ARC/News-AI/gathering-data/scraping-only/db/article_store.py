@@ -0,0 +1,387 @@
+# db/article_store.py
+import os
+import sqlite3
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from db.compression import ContentCodec, derive_description
+from db.dedup import NearDuplicateIndex, simhash
+from db.search_index import ArticleSearchIndex
+
+logger = logging.getLogger(__name__)
+
+INSERT_ARTICLE_SQL = '''
+    INSERT OR IGNORE INTO news_articles
+    (title, description, content, content_codec, url, source, published_at, collection_method)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Columns the read API can project; description and content are decoded on the way out
+ARTICLE_COLUMNS = ('id', 'title', 'description', 'content', 'url', 'source',
+                   'published_at', 'collected_at', 'collection_method', 'canonical_id')
+# Indexed columns articles can be streamed by (newest first)
+ORDER_COLUMNS = ('id', 'collected_at', 'published_at')
+# How each timestamp column is written, so a since bound compares as text in the same format:
+# collected_at comes from SQLite's CURRENT_TIMESTAMP, published_at from datetime.isoformat()
+TIMESTAMP_FORMATS = {'collected_at': '%Y-%m-%d %H:%M:%S', 'published_at': '%Y-%m-%dT%H:%M:%S'}
+
+
+def open_read_only(db_path: str) -> sqlite3.Connection:
+    """Plain read-only connection for quick reports: no schema setup, migrations or index builds"""
+    return sqlite3.connect(Path(db_path).absolute().as_uri() + '?mode=ro', uri=True)
+
+
+class ArticleStore:
+    def __init__(self, db_path: str = os.path.join("db", "news_data.db"),
+                 cached_statements: int = 256, busy_timeout: float = 30.0):
+        """
+        Long-lived connection to the article database, shared by every helper.
+        WAL journaling lets readers run alongside the bulk writer.
+        """
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(
+            db_path,
+            timeout=busy_timeout,
+            check_same_thread=False,
+            cached_statements=cached_statements
+        )
+        self.configure_connection()
+        self.setup_schema()
+        self.content_codec = ContentCodec(self)
+        self.near_duplicates = NearDuplicateIndex(self)
+        self.search_index = ArticleSearchIndex(self)
+
+    def configure_connection(self):
+        """Pragmas tuned for bulk loading"""
+        with self._lock:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            # NORMAL is durable across application crashes in WAL mode and avoids an fsync per commit
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.conn.execute('PRAGMA temp_store=MEMORY')
+            self.conn.execute('PRAGMA cache_size=-65536')
+
+    def setup_schema(self):
+        """Create database table for news articles"""
+        with self._lock:
+            cursor = self.conn.cursor()
+
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS news_articles (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    title TEXT NOT NULL,
+                    description TEXT,
+                    content TEXT,
+                    url TEXT UNIQUE,
+                    source TEXT,
+                    published_at TIMESTAMP,
+                    collected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    collection_method TEXT,
+                    canonical_id INTEGER,
+                    content_codec TEXT
+                )
+            ''')
+
+            # Databases created by earlier versions lack the newer columns
+            columns = [row[1] for row in cursor.execute('PRAGMA table_info(news_articles)')]
+            for column, column_type in (('canonical_id', 'INTEGER'), ('content_codec', 'TEXT')):
+                if column not in columns:
+                    cursor.execute(f'ALTER TABLE news_articles ADD COLUMN {column} {column_type}')
+
+            # Create indexes for faster queries
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_collected_at ON news_articles(collected_at)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_published_at ON news_articles(published_at)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_source ON news_articles(source)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_canonical_id ON news_articles(canonical_id)')
+
+            self.conn.commit()
+
+    def query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        """Run a read query and return all rows"""
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def query_one(self, sql: str, params: tuple = ()) -> Optional[tuple]:
+        """Run a read query and return the first row"""
+        with self._lock:
+            return self.conn.execute(sql, params).fetchone()
+
+    def execute(self, sql: str, params: tuple = ()) -> int:
+        """Run a write statement in its own transaction; returns affected rows"""
+        with self._lock:
+            with self.conn:
+                return self.conn.execute(sql, params).rowcount
+
+    def executemany(self, sql: str, rows: List[tuple]) -> int:
+        """Run a write statement for many rows in one transaction"""
+        with self._lock:
+            with self.conn:
+                return self.conn.executemany(sql, rows).rowcount
+
+    def decode_article(self, description: Optional[str], content, codec: Optional[str]) -> Tuple[str, str]:
+        """(description, content) of a stored row, decompressing the content"""
+        content = self.content_codec.decode(content, codec)
+        return description if description is not None else derive_description(content), content
+
+    def article_filters(self, since: Optional[datetime] = None, since_column: str = 'collected_at',
+                        source: Optional[str] = None, include_duplicates: bool = True) -> Tuple[List[str], List]:
+        """WHERE conditions and parameters shared by the streaming and count queries"""
+        if since_column not in TIMESTAMP_FORMATS:
+            raise ValueError(f"Cannot filter articles by {since_column}")
+        conditions, params = [], []
+        if since:
+            conditions.append(f'{since_column} >= ?')
+            params.append(since.strftime(TIMESTAMP_FORMATS[since_column]))
+        if source:
+            conditions.append('source = ?')
+            params.append(source)
+        if not include_duplicates:
+            conditions.append('canonical_id IS NULL')
+        return conditions, params
+
+    def count_articles(self, since: Optional[datetime] = None, since_column: str = 'collected_at',
+                       source: Optional[str] = None, include_duplicates: bool = True) -> int:
+        """Number of articles matching the filters, without reading any rows"""
+        conditions, params = self.article_filters(since, since_column, source, include_duplicates)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        return self.query_one(f'SELECT COUNT(*) FROM news_articles {where}', tuple(params))[0]
+
+    def iter_articles(self, columns: Optional[Sequence[str]] = None, since: Optional[datetime] = None,
+                      since_column: str = 'collected_at', source: Optional[str] = None,
+                      order_by: str = 'collected_at', batch_size: int = 1000, limit: Optional[int] = None,
+                      include_duplicates: bool = True, after_id: Optional[int] = None,
+                      ascending: bool = False) -> Iterator[Dict]:
+        """
+        Stream articles newest first (oldest first with ascending=True) as dicts
+        of the requested columns (all by default), optionally only ids above after_id.
+        Rows are read batch_size at a time with keyset pagination on (order_by, id),
+        so memory stays flat and each batch is an index range scan rather than an
+        OFFSET skip. The connection is only held while a batch is read.
+        """
+        columns = list(columns or ARTICLE_COLUMNS)
+        unknown = set(columns) - set(ARTICLE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown article columns: {sorted(unknown)}")
+        if order_by not in ORDER_COLUMNS:
+            raise ValueError(f"Cannot order articles by {order_by}")
+
+        selected = list(dict.fromkeys(columns + ['id', order_by]))
+        decode = 'description' in columns or 'content' in columns
+        if decode:
+            selected += [column for column in ('description', 'content', 'content_codec') if column not in selected]
+        filters, filter_params = self.article_filters(since, since_column, source, include_duplicates)
+        if after_id is not None:
+            filters.append('id > ?')
+            filter_params.append(after_id)
+
+        direction, compare = ('ASC', '>') if ascending else ('DESC', '<')
+        # SQLite sorts NULLs lowest; they get their own pass ordered by id
+        passes = ['id'] if order_by == 'id' else [order_by, None]
+        if ascending:
+            passes.reverse()
+        yielded = 0
+        for sort_column in passes:
+            last_key = None
+            while limit is None or yielded < limit:
+                conditions, params = list(filters), list(filter_params)
+                if sort_column == 'id' or sort_column is None:
+                    if sort_column is None:
+                        conditions.append(f'{order_by} IS NULL')
+                    if last_key:
+                        conditions.append(f'id {compare} ?')
+                        params.append(last_key[1])
+                    order = f'id {direction}'
+                else:
+                    conditions.append(f'{sort_column} IS NOT NULL')
+                    if last_key:
+                        conditions.append(f'({sort_column}, id) {compare} (?, ?)')
+                        params.extend(last_key)
+                    order = f'{sort_column} {direction}, id {direction}'
+
+                fetch = batch_size if limit is None else min(batch_size, limit - yielded)
+                rows = self.query(
+                    f"SELECT {', '.join(selected)} FROM news_articles "
+                    f"WHERE {' AND '.join(conditions)} ORDER BY {order} LIMIT ?",
+                    tuple(params + [fetch])
+                )
+
+                for row in rows:
+                    record = dict(zip(selected, row))
+                    if decode:
+                        record['description'], record['content'] = self.decode_article(
+                            record['description'], record['content'], record['content_codec']
+                        )
+                    yield {column: record[column] for column in columns}
+
+                yielded += len(rows)
+                if len(rows) < fetch:
+                    break
+                last_key = (record[order_by], record['id'])
+
+    @contextmanager
+    def transaction(self):
+        """Hold the connection for several statements committed together"""
+        with self._lock:
+            with self.conn:
+                yield self.conn
+
+    def insert_articles(self, articles: List[Dict]) -> int:
+        """
+        Insert articles in a single transaction; returns the number of new rows.
+        New rows are added to the full-text index and fingerprinted in the same
+        transaction, and linked to the article they near-duplicate through
+        canonical_id. Content is stored compressed; a description that is just
+        the start of the content is left NULL and derived on read. Raises
+        sqlite3.Error if the transaction fails, in which case nothing of the
+        batch is stored.
+        """
+        if not articles:
+            return 0
+
+        rows = []
+        for article in articles:
+            source_name = article.get('source', 'Unknown')
+            content = article.get('content', '')
+            description = article.get('description', '')
+            stored_content, codec = self.content_codec.encode(source_name, content)
+            rows.append((
+                article.get('title', ''),
+                None if description == derive_description(content) else description,
+                stored_content,
+                codec,
+                article.get('url', ''),
+                source_name,
+                article.get('published_at'),
+                article.get('collection_method', 'unknown')
+            ))
+        # Records from the parse stage arrive fingerprinted; hash the rest before taking the lock
+        fingerprints = {
+            article.get('url', ''): article['simhash'] if 'simhash' in article else simhash(article.get('content'))
+            for article in articles
+        }
+        by_url = {article.get('url', ''): article for article in articles}
+
+        with self._lock:
+            with self.conn:
+                last_id = self.conn.execute('SELECT COALESCE(MAX(id), 0) FROM news_articles').fetchone()[0]
+                self.conn.executemany(INSERT_ARTICLE_SQL, rows)
+                new_rows = self.conn.execute(
+                    'SELECT id, url FROM news_articles WHERE id > ? ORDER BY id', (last_id,)
+                ).fetchall()
+                # Rows another connection wrote meanwhile are indexed by that writer
+                new_rows = [(article_id, url) for article_id, url in new_rows if url in by_url]
+                for article_id, url in new_rows:
+                    self.search_index.add(article_id, by_url[url])
+                    self.near_duplicates.register(article_id, fingerprints[url])
+
+            for source_name in self.content_codec.needs_dictionary():
+                self.content_codec.train(source_name)
+            return len(new_rows)
+
+    def compact(self):
+        """Rebuild the database file to hand freed pages back to the filesystem"""
+        with self._lock:
+            self.conn.execute('VACUUM')
+            self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def close(self):
+        """Close the connection"""
+        with self._lock:
+            self.conn.close()
+
+
+class ArticleBatchWriter:
+    def __init__(self, store: ArticleStore, batch_size: int = 500, flush_interval: float = 5.0,
+                 on_write: Optional[Callable[[str, int, float], None]] = None,
+                 on_stored: Optional[Callable[[List[Dict]], None]] = None):
+        """
+        Buffer articles and write them with executemany once batch_size rows
+        are queued or flush_interval seconds have passed since the first one.
+        on_write(source, new rows, seconds) is called after every insert and
+        on_stored(articles) once those articles are committed. Articles whose
+        insert failed are kept in failed instead of being retried.
+        """
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_write = on_write
+        self.on_stored = on_stored
+        self.stored_by_source: Dict[str, int] = {}
+        self.failed: List[Dict] = []
+
+        self._buffer: List[Dict] = []
+        self._buffer_started = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._timer = threading.Thread(target=self._flush_loop, name='article-writer', daemon=True)
+        self._timer.start()
+
+    @property
+    def stored_count(self) -> int:
+        return sum(self.stored_by_source.values())
+
+    def add(self, article: Dict):
+        """Queue one article"""
+        self.add_many([article])
+
+    def add_many(self, articles: List[Dict]):
+        """Queue several articles, flushing when the batch is full"""
+        if not articles:
+            return
+        with self._lock:
+            if not self._buffer:
+                self._buffer_started = time.monotonic()
+            self._buffer.extend(articles)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns the number of new rows"""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+            if not batch:
+                return 0
+
+            stored = 0
+            by_source: Dict[str, List[Dict]] = {}
+            for article in batch:
+                by_source.setdefault(article.get('source', 'Unknown'), []).append(article)
+
+            for source_name, articles in by_source.items():
+                start = time.perf_counter()
+                try:
+                    count = self.store.insert_articles(articles)
+                except sqlite3.Error as e:
+                    logger.error(f"Error storing batch of {len(articles)} {source_name} articles: {e}")
+                    self.failed.extend(articles)
+                    continue
+                if self.on_write is not None:
+                    self.on_write(source_name, count, time.perf_counter() - start)
+                if self.on_stored is not None:
+                    self.on_stored(articles)
+                self.stored_by_source[source_name] = self.stored_by_source.get(source_name, 0) + count
+                stored += count
+
+        logger.debug(f"Flushed {len(batch)} articles ({stored} new)")
+        return stored
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval / 2 or 0.5):
+            with self._lock:
+                due = self._buffer and time.monotonic() - self._buffer_started >= self.flush_interval
+            if due:
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Error flushing article batch: {e}")
+
+    def close(self) -> int:
+        """Stop the timer and write any remaining rows"""
+        self._stop.set()
+        self._timer.join()
+        return self.flush()
@@ -0,0 +1,117 @@
+# db/backfill_state.py
+import logging
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from db.article_store import ArticleStore
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class BackfillTracker:
+    def __init__(self, store: ArticleStore, max_attempts: int = 3):
+        """
+        Work-unit table for historical backfills, one row per (source, day).
+        Each unit records its status, attempts and article count, so an
+        interrupted backfill resumes exactly where it stopped.
+        """
+        self.store = store
+        self.max_attempts = max_attempts
+        self.setup_schema()
+        self.recover_interrupted()
+
+    def setup_schema(self):
+        """Create the work-unit table"""
+        self.store.execute('''
+            CREATE TABLE IF NOT EXISTS backfill_units (
+                source TEXT NOT NULL,
+                day TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                article_count INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (source, day)
+            )
+        ''')
+        self.store.execute('CREATE INDEX IF NOT EXISTS idx_backfill_status ON backfill_units(status, day)')
+
+    def recover_interrupted(self):
+        """Units left 'running' by a crashed process go back to the queue"""
+        recovered = self.store.execute(
+            "UPDATE backfill_units SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE status = ?",
+            (PENDING, RUNNING)
+        )
+        if recovered:
+            logger.info(f"Re-queued {recovered} interrupted backfill units")
+
+    def seed(self, source_names: List[str], from_date: datetime, to_date: datetime):
+        """Register a unit for every source and day in the range (existing units are kept)"""
+        days = []
+        current = from_date.date()
+        while current <= to_date.date():
+            days.append(current.isoformat())
+            current += timedelta(days=1)
+
+        self.store.executemany(
+            'INSERT OR IGNORE INTO backfill_units (source, day) VALUES (?, ?)',
+            [(source_name, day) for source_name in source_names for day in days]
+        )
+
+    def open_days(self, source_name: str, from_date: datetime, to_date: datetime,
+                  newest_first: bool = False) -> List[date]:
+        """Days in the range still to be collected for a source, oldest first unless newest_first"""
+        rows = self.store.query(f'''
+            SELECT day FROM backfill_units
+            WHERE source = ? AND day BETWEEN ? AND ? AND status != ? AND attempts < ?
+            ORDER BY day {'DESC' if newest_first else 'ASC'}
+        ''', (source_name, from_date.date().isoformat(), to_date.date().isoformat(), DONE, self.max_attempts))
+        return [date.fromisoformat(row[0]) for row in rows]
+
+    def earliest_open_day(self, source_name: Optional[str] = None) -> Optional[date]:
+        """Oldest day a source (or any source) still has to collect"""
+        if source_name is None:
+            row = self.store.query_one(
+                'SELECT MIN(day) FROM backfill_units WHERE status != ? AND attempts < ?',
+                (DONE, self.max_attempts)
+            )
+        else:
+            row = self.store.query_one(
+                'SELECT MIN(day) FROM backfill_units WHERE source = ? AND status != ? AND attempts < ?',
+                (source_name, DONE, self.max_attempts)
+            )
+        return date.fromisoformat(row[0]) if row and row[0] else None
+
+    def mark_running(self, source_name: str, day: date):
+        self.store.execute('''
+            UPDATE backfill_units SET status = ?, attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE source = ? AND day = ?
+        ''', (RUNNING, source_name, day.isoformat()))
+
+    def mark_done(self, source_name: str, day: date, article_count: int):
+        self.store.execute('''
+            UPDATE backfill_units SET status = ?, article_count = ?, last_error = NULL, updated_at = CURRENT_TIMESTAMP
+            WHERE source = ? AND day = ?
+        ''', (DONE, article_count, source_name, day.isoformat()))
+
+    def mark_failed(self, source_name: str, day: date, error: str):
+        self.store.execute('''
+            UPDATE backfill_units SET status = ?, last_error = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE source = ? AND day = ?
+        ''', (FAILED, error, source_name, day.isoformat()))
+
+    def count_archived(self, source_name: str, day: date) -> int:
+        """Articles stored for a source's archive page of one day"""
+        row = self.store.query_one('''
+            SELECT COUNT(*) FROM news_articles
+            WHERE source = ? AND collection_method = 'archive' AND published_at >= ? AND published_at < ?
+        ''', (source_name, day.isoformat(), (day + timedelta(days=1)).isoformat()))
+        return row[0]
+
+    def progress(self) -> dict:
+        """Unit counts by status"""
+        return dict(self.store.query('SELECT status, COUNT(*) FROM backfill_units GROUP BY status'))
@@ -0,0 +1,77 @@
+# db/collection_watermarks.py
+import logging
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from db.article_store import ArticleStore
+
+logger = logging.getLogger(__name__)
+
+# Collection methods that keep a watermark
+LIVE = 'current'
+ARCHIVE = 'archive'
+
+
+class CollectionWatermarks:
+    def __init__(self, store: ArticleStore):
+        """
+        Per-source, per-method watermarks: the time up to which a source is
+        known to be collected by that method. LIVE advances to the moment a
+        source's front page (or feed) was read and its articles stored; ARCHIVE
+        advances to the end of the newest archive day finished. A source that
+        fails keeps its old watermark, so its gap is collected on the next run
+        without touching the sources that succeeded.
+        """
+        self.store = store
+        self.setup_schema()
+
+    def setup_schema(self):
+        """Create the watermark table, seeded from stored articles on first use"""
+        self.store.execute('''
+            CREATE TABLE IF NOT EXISTS collection_watermarks (
+                source TEXT NOT NULL,
+                method TEXT NOT NULL,
+                watermark TEXT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (source, method)
+            )
+        ''')
+        if self.store.query_one('SELECT COUNT(*) FROM collection_watermarks')[0] == 0:
+            self.seed_from_articles()
+
+    def seed_from_articles(self):
+        """Start from each source's newest stored article, as the global MAX(collected_at) did for all"""
+        seeded = self.store.execute('''
+            INSERT OR IGNORE INTO collection_watermarks (source, method, watermark)
+            SELECT source, ?, REPLACE(MAX(collected_at), ' ', 'T') FROM news_articles
+            WHERE source IS NOT NULL AND collected_at IS NOT NULL
+            GROUP BY source
+        ''', (LIVE,))
+        if seeded:
+            logger.info(f"Seeded collection watermarks for {seeded} sources from stored articles")
+
+    def get(self, source_name: str, method: str) -> Optional[datetime]:
+        row = self.store.query_one(
+            'SELECT watermark FROM collection_watermarks WHERE source = ? AND method = ?',
+            (source_name, method)
+        )
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def collected_until(self, source_name: str) -> Optional[datetime]:
+        """Latest watermark of a source over every method"""
+        row = self.store.query_one('SELECT MAX(watermark) FROM collection_watermarks WHERE source = ?', (source_name,))
+        return datetime.fromisoformat(row[0]) if row and row[0] else None
+
+    def advance(self, source_name: str, method: str, watermark: datetime):
+        """Move a watermark forward (never back)"""
+        self.store.execute('''
+            INSERT INTO collection_watermarks (source, method, watermark) VALUES (?, ?, ?)
+            ON CONFLICT(source, method) DO UPDATE SET
+                watermark = MAX(watermark, excluded.watermark),
+                updated_at = CURRENT_TIMESTAMP
+        ''', (source_name, method, watermark.isoformat()))
+
+    def all(self) -> Dict[Tuple[str, str], datetime]:
+        """(source, method) -> watermark"""
+        return {(source_name, method): datetime.fromisoformat(watermark)
+                for source_name, method, watermark in self.store.query(
+                    'SELECT source, method, watermark FROM collection_watermarks')}
@@ -0,0 +1,260 @@
+# db/compression.py
+import zlib
+import logging
+import threading
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# zstd compresses faster and smaller with a trained dictionary; use it whenever it is installed
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_CODEC = 'zstd' if zstandard else 'zlib'
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+DESCRIPTION_LENGTH = 300
+# A source gets a dictionary once this many of its articles were stored without one
+TRAIN_AFTER = 200
+# zlib can only reference the last 32 KB, so a larger preset dictionary is wasted
+ZLIB_DICT_SIZE = 32 * 1024
+ZSTD_DICT_SIZE = 64 * 1024
+# Word n-grams considered when building a zlib dictionary
+DICT_SHINGLE = 4
+
+
+def derive_description(content: Optional[str]) -> str:
+    """Description shown for an article: the first part of its content"""
+    content = content or ''
+    return content[:DESCRIPTION_LENGTH] + "..." if len(content) > DESCRIPTION_LENGTH else content
+
+
+def train_zlib_dictionary(samples: List[str], size: int = ZLIB_DICT_SIZE) -> bytes:
+    """
+    Preset dictionary of the phrases most shared across samples (boilerplate,
+    bylines, recurring wording), most valuable last since deflate reaches
+    nearby bytes most cheaply
+    """
+    counts: Counter = Counter()
+    for text in samples:
+        words = text.split()
+        counts.update({' '.join(words[i:i + DICT_SHINGLE]) for i in range(len(words) - DICT_SHINGLE + 1)})
+
+    shared = [(phrase, count) for phrase, count in counts.items() if count > 1]
+    shared.sort(key=lambda item: item[1] * len(item[0]), reverse=True)
+
+    picked, total = [], 0
+    for phrase, _ in shared:
+        encoded = phrase.encode('utf-8') + b' '
+        if total + len(encoded) > size:
+            break
+        picked.append(encoded)
+        total += len(encoded)
+    return b''.join(reversed(picked))
+
+
+class ContentCodec:
+    def __init__(self, store, codec: str = DEFAULT_CODEC):
+        """
+        Compresses article content for storage. Each source gets its own
+        dictionary, trained from its first stored articles, because news
+        bodies are short and share most of their wording within a source.
+
+        news_articles.content_codec records how a row is encoded:
+        NULL (plain text), 'zlib' / 'zstd', or 'zlib:<id>' / 'zstd:<id>'
+        for a dictionary in compression_dictionaries.
+        """
+        if codec == 'zstd' and zstandard is None:
+            logger.warning("zstandard is not installed, compressing with zlib")
+            codec = 'zlib'
+        self.store = store
+        self.codec = codec
+        self._dictionaries: Dict[int, bytes] = {}
+        # Current dictionary per source: source -> (dictionary id, bytes)
+        self._source_dictionaries: Dict[str, Tuple[int, bytes]] = {}
+        self._undictionaried: Counter = Counter()
+        self._lock = threading.Lock()
+        # Per-thread compressors and decompressors by dictionary id (zstd contexts are not thread-safe)
+        self._contexts = threading.local()
+        self.setup_schema()
+        self.load_dictionaries()
+
+    def setup_schema(self):
+        """Create the dictionary table"""
+        self.store.execute('''
+            CREATE TABLE IF NOT EXISTS compression_dictionaries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT NOT NULL,
+                codec TEXT NOT NULL,
+                dictionary BLOB NOT NULL,
+                sample_count INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+    def load_dictionaries(self):
+        """Newest dictionary of this codec per source becomes the one used for writing"""
+        rows = self.store.query('SELECT id, source, codec, dictionary FROM compression_dictionaries ORDER BY id')
+        with self._lock:
+            for dictionary_id, source_name, codec, dictionary in rows:
+                self._dictionaries[dictionary_id] = dictionary
+                if codec == self.codec:
+                    self._source_dictionaries[source_name] = (dictionary_id, dictionary)
+
+    def dictionary(self, dictionary_id: int) -> bytes:
+        with self._lock:
+            dictionary = self._dictionaries.get(dictionary_id)
+        if dictionary is None:
+            row = self.store.query_one('SELECT dictionary FROM compression_dictionaries WHERE id = ?', (dictionary_id,))
+            if row is None:
+                raise ValueError(f"Unknown compression dictionary {dictionary_id}")
+            dictionary = row[0]
+            with self._lock:
+                self._dictionaries[dictionary_id] = dictionary
+        return dictionary
+
+    def context(self, kind: str, dictionary_id: Optional[int], factory: Callable):
+        """This thread's cached context of a kind (e.g. 'compress') for a dictionary, built once by factory"""
+        contexts = getattr(self._contexts, kind, None)
+        if contexts is None:
+            contexts = {}
+            setattr(self._contexts, kind, contexts)
+        context = contexts.get(dictionary_id)
+        if context is None:
+            context = contexts[dictionary_id] = factory()
+        return context
+
+    def encode(self, source_name: str, content: Optional[str]) -> Tuple[Optional[bytes], Optional[str]]:
+        """(stored value, content_codec) for an article body"""
+        if not content:
+            return content, None
+
+        with self._lock:
+            current = self._source_dictionaries.get(source_name)
+            if current is None:
+                self._undictionaried[source_name] += 1
+
+        data = content.encode('utf-8')
+        dictionary_id, dictionary = current if current else (None, None)
+        if self.codec == 'zstd':
+            compressor = self.context('compress', dictionary_id, lambda: zstandard.ZstdCompressor(
+                level=ZSTD_LEVEL, dict_data=zstandard.ZstdCompressionDict(dictionary) if dictionary else None))
+            blob = compressor.compress(data)
+        else:
+            # A zlib stream is single-use: copy a primed one instead of loading the dictionary each time
+            compressor = self.context('compress', dictionary_id, lambda: (
+                zlib.compressobj(ZLIB_LEVEL, zdict=dictionary) if dictionary else zlib.compressobj(ZLIB_LEVEL))).copy()
+            blob = compressor.compress(data) + compressor.flush()
+
+        codec = f'{self.codec}:{dictionary_id}' if dictionary_id else self.codec
+        return blob, codec
+
+    def decode(self, value, codec: Optional[str]) -> Optional[str]:
+        """Article body from its stored value"""
+        if not codec or value is None:
+            return value
+
+        name, _, dictionary_id = codec.partition(':')
+        dictionary_id = int(dictionary_id) if dictionary_id else None
+        if name == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read zstd-compressed articles")
+            decompressor = self.context('decompress', dictionary_id, lambda: zstandard.ZstdDecompressor(
+                dict_data=zstandard.ZstdCompressionDict(self.dictionary(dictionary_id)) if dictionary_id else None))
+            data = decompressor.decompress(value)
+        else:
+            # inflate applies the dictionary lazily, so a primed copy would not save anything here
+            decompressor = zlib.decompressobj(zdict=self.dictionary(dictionary_id)) if dictionary_id else zlib.decompressobj()
+            data = decompressor.decompress(value) + decompressor.flush()
+        return data.decode('utf-8')
+
+    def needs_dictionary(self) -> List[str]:
+        """Sources that stored enough articles without a dictionary to train one"""
+        with self._lock:
+            return [name for name, count in self._undictionaried.items()
+                    if count >= TRAIN_AFTER and name not in self._source_dictionaries]
+
+    def train(self, source_name: str, sample_size: int = 1000) -> Optional[int]:
+        """
+        Train and register a dictionary from a source's most recent articles.
+        If training fails, the source waits for another TRAIN_AFTER articles
+        before the next attempt.
+        """
+        dictionary, sample_count = self.train_dictionary(source_name, sample_size)
+        if not dictionary:
+            with self._lock:
+                self._undictionaried[source_name] = 0
+            return None
+
+        with self.store.transaction() as conn:
+            dictionary_id = conn.execute(
+                'INSERT INTO compression_dictionaries (source, codec, dictionary, sample_count) VALUES (?, ?, ?, ?)',
+                (source_name, self.codec, dictionary, sample_count)
+            ).lastrowid
+        with self._lock:
+            self._dictionaries[dictionary_id] = dictionary
+            self._source_dictionaries[source_name] = (dictionary_id, dictionary)
+            self._undictionaried.pop(source_name, None)
+
+        logger.info(f"Trained {self.codec} dictionary for {source_name}: {len(dictionary)} bytes from {sample_count} articles")
+        return dictionary_id
+
+    def train_dictionary(self, source_name: str, sample_size: int) -> Tuple[Optional[bytes], int]:
+        """(dictionary, samples used) from a source's most recent articles; no dictionary if there is too little to learn from"""
+        rows = self.store.query('''
+            SELECT content, content_codec FROM news_articles
+            WHERE source = ? AND content IS NOT NULL
+            ORDER BY id DESC LIMIT ?
+        ''', (source_name, sample_size))
+        samples = [self.decode(content, codec) for content, codec in rows]
+        samples = [sample for sample in samples if sample]
+        if len(samples) < 2:
+            return None, len(samples)
+
+        if self.codec == 'zstd':
+            try:
+                encoded = [sample.encode('utf-8') for sample in samples]
+                return zstandard.train_dictionary(ZSTD_DICT_SIZE, encoded).as_bytes(), len(samples)
+            except zstandard.ZstdError as e:
+                logger.warning(f"Could not train a zstd dictionary for {source_name}: {e}")
+                return None, len(samples)
+        return train_zlib_dictionary(samples), len(samples)
+
+    def migrate(self, batch_size: int = 500) -> int:
+        """Compress rows stored as plain text and drop descriptions that can be derived"""
+        sources = [row[0] for row in self.store.query(
+            'SELECT DISTINCT source FROM news_articles WHERE content_codec IS NULL AND content IS NOT NULL'
+        )]
+        for source_name in sources:
+            if source_name not in self._source_dictionaries:
+                self.train(source_name)
+
+        migrated = 0
+        last_id = 0
+        while True:
+            rows = self.store.query('''
+                SELECT id, source, description, content FROM news_articles
+                WHERE id > ? AND content_codec IS NULL AND content IS NOT NULL AND content != ''
+                ORDER BY id LIMIT ?
+            ''', (last_id, batch_size))
+            if not rows:
+                break
+
+            updates = []
+            for article_id, source_name, description, content in rows:
+                blob, codec = self.encode(source_name, content)
+                if description == derive_description(content):
+                    description = None
+                updates.append((blob, codec, description, article_id))
+            self.store.executemany(
+                'UPDATE news_articles SET content = ?, content_codec = ?, description = ? WHERE id = ?', updates
+            )
+
+            migrated += len(rows)
+            last_id = rows[-1][0]
+            logger.info(f"Compressed {migrated} articles (up to id {last_id})")
+        return migrated
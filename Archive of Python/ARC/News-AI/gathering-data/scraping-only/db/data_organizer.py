@@ -1,21 +1,124 @@
 # db/data_organizer.py
 import os
-import sqlite3
+import gzip
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import logging
+from db.article_store import ArticleStore
+from db.export_manifest import ExportManifest
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Fields the organizer writes out for each article
+ARTICLE_FIELDS = ['id', 'title', 'description', 'content', 'url', 'source', 'published_at', 'collected_at']
+# Manifest entries are committed in batches of this many written files
+MANIFEST_BATCH = 200
+# 'txt': one text file per article under Source/YYYY/MM/DD/
+# 'jsonl': one gzipped JSON-lines shard per source and day, Source/YYYY/MM/YYYY-MM-DD.jsonl.gz
+OUTPUT_FORMATS = ('txt', 'jsonl')
+SHARD_COMPRESSLEVEL = 6
+DEFAULT_DATA_DIR = "news_data"
+
+
+def organization_statistics(counts: Iterable[Tuple[str, str, int]]) -> Dict:
+    """Nested source/year/month/day statistics from manifest (source folder, YYYY-MM-DD, articles) counts"""
+    stats = {
+        'total_sources': 0,
+        'total_articles': 0,
+        'sources': {}
+    }
+    
+    for source_folder, article_day, count in counts:
+        try:
+            year, month, day = article_day.split('-')
+        except (AttributeError, ValueError):
+            continue
+        source_stats = stats['sources'].setdefault(source_folder, {'total': 0, 'years': {}})
+        year_stats = source_stats['years'].setdefault(year, {'total': 0, 'months': {}})
+        month_stats = year_stats['months'].setdefault(month, {'total': 0, 'days': {}})
+        
+        month_stats['days'][day] = count
+        month_stats['total'] += count
+        year_stats['total'] += count
+        source_stats['total'] += count
+        stats['total_articles'] += count
+    
+    stats['total_sources'] = len(stats['sources'])
+    return stats
+
+
+def scan_organization_statistics(base_data_dir: str = DEFAULT_DATA_DIR) -> Dict:
+    """Statistics by walking the text layout on disk (for trees exported before the manifest)"""
+    stats = {
+        'total_sources': 0,
+        'total_articles': 0,
+        'sources': {}
+    }
+    
+    if not os.path.exists(base_data_dir):
+        return stats
+    
+    # Walk through directory structure
+    for source_folder in os.listdir(base_data_dir):
+        source_path = os.path.join(base_data_dir, source_folder)
+        if os.path.isdir(source_path):
+            source_stats = {'total': 0, 'years': {}}
+            
+            # Count articles in each year/month/day
+            for year_folder in os.listdir(source_path):
+                year_path = os.path.join(source_path, year_folder)
+                if os.path.isdir(year_path):
+                    year_stats = {'total': 0, 'months': {}}
+                    
+                    for month_folder in os.listdir(year_path):
+                        month_path = os.path.join(year_path, month_folder)
+                        if os.path.isdir(month_path):
+                            month_stats = {'total': 0, 'days': {}}
+                            
+                            for day_folder in os.listdir(month_path):
+                                day_path = os.path.join(month_path, day_folder)
+                                if os.path.isdir(day_path):
+                                    file_count = len([f for f in os.listdir(day_path) if f.endswith('.txt')])
+                                    month_stats['days'][day_folder] = file_count
+                                    month_stats['total'] += file_count
+                            
+                            year_stats['months'][month_folder] = month_stats
+                            year_stats['total'] += month_stats['total']
+                    
+                    source_stats['years'][year_folder] = year_stats
+                    source_stats['total'] += year_stats['total']
+            
+            stats['sources'][source_folder] = source_stats
+            stats['total_articles'] += source_stats['total']
+    
+    stats['total_sources'] = len(stats['sources'])
+    return stats
+
 class NewsDataOrganizer:
-    def __init__(self, db_path: str = os.path.join("db", "news_data.db"), base_data_dir: str = "news_data"):
+    def __init__(self, db_path: str = os.path.join("db", "news_data.db"), base_data_dir: str = DEFAULT_DATA_DIR,
+                 write_workers: int = 8, output_format: str = 'txt'):
         """
-        Initialize the data organizer with hierarchical folder structure
+        Initialize the data organizer with hierarchical folder structure.
+        Files are written by write_workers threads (1 writes inline).
+        output_format 'jsonl' packs each source's day into one shard file.
         """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format {output_format!r}, expected one of {OUTPUT_FORMATS}")
         self.db_path = db_path
         self.base_data_dir = base_data_dir
+        self.write_workers = write_workers
+        self.output_format = output_format
+        self.store = ArticleStore(db_path)
+        self.manifest = ExportManifest(self.store, base_data_dir)
+        # Directory -> file names in it, filled by one listdir when the directory is first used
+        self._dir_entries: Dict[str, set] = {}
+        self._dir_lock = threading.Lock()
         self.setup_directories()
     
     def setup_directories(self):
@@ -24,31 +127,48 @@ class NewsDataOrganizer:
             os.makedirs(self.base_data_dir)
             logger.info(f"Created base data directory: {self.base_data_dir}")
     
-    def create_hierarchical_directory(self, source_name: str, article_date: datetime) -> str:
-        """Create hierarchical directory structure: source/year/month/day"""
+    def month_directory(self, source_name: str, article_date: datetime) -> str:
+        """Path of a source's month directory: source/year/month (not created)"""
         # Clean source name for directory use
         clean_source_name = "".join(c for c in source_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
         clean_source_name = clean_source_name.replace(' ', '_')
         
-        # Extract date components
-        year = article_date.strftime('%Y')
-        month = article_date.strftime('%m')
-        day = article_date.strftime('%d')
-        
-        # Create full path: news_data/Source_Name/YYYY/MM/DD/
-        source_dir = os.path.join(self.base_data_dir, clean_source_name)
-        year_dir = os.path.join(source_dir, year)
-        month_dir = os.path.join(year_dir, month)
-        day_dir = os.path.join(month_dir, day)
+        # news_data/Source_Name/YYYY/MM/
+        return os.path.join(self.base_data_dir, clean_source_name, article_date.strftime('%Y'), article_date.strftime('%m'))
+    
+    def create_hierarchical_directory(self, source_name: str, article_date: datetime) -> str:
+        """Create hierarchical directory structure: source/year/month/day"""
+        day_dir = os.path.join(self.month_directory(source_name, article_date), article_date.strftime('%d'))
         
         # Create directory structure if it doesn't exist
-        for directory in [source_dir, year_dir, month_dir, day_dir]:
-            if not os.path.exists(directory):
-                os.makedirs(directory)
-                logger.debug(f"Created directory: {directory}")
-        
+        self.ensure_directory(day_dir)
         return day_dir
     
+    def ensure_directory(self, directory: str) -> set:
+        """Create a directory once per run; returns the cached set of its file names"""
+        with self._dir_lock:
+            entries = self._dir_entries.get(directory)
+            if entries is None:
+                os.makedirs(directory, exist_ok=True)
+                entries = set(os.listdir(directory))
+                self._dir_entries[directory] = entries
+                logger.debug(f"Using directory: {directory}")
+            return entries
+    
+    def reserve_filename(self, directory: str, filename: str) -> str:
+        """Unique path for a new file, resolved against the cached listing instead of stat calls"""
+        entries = self.ensure_directory(directory)
+        name, extension = os.path.splitext(filename)
+        with self._dir_lock:
+            # If another article has this name, add counter to make it unique
+            candidate = filename
+            counter = 1
+            while candidate in entries:
+                candidate = f"{name}_{counter}{extension}"
+                counter += 1
+            entries.add(candidate)
+        return os.path.join(directory, candidate)
+    
     def sanitize_filename(self, title: str, max_length: int = 100) -> str:
         """Create a safe filename from article title"""
         # Remove invalid characters
@@ -97,41 +217,149 @@ class NewsDataOrganizer:
         # Ultimate fallback - current time
         return datetime.now()
     
-    def save_article_to_file(self, article: Dict) -> bool:
-        """Save individual article to hierarchical folder structure"""
+    def article_stem(self, article: Dict) -> Tuple[str, str]:
+        """(day directory, file name without extension) an article's text file is named after"""
+        # Parse article date
+        article_date = self.parse_article_date(article)
+        
+        # Create hierarchical directory
+        day_dir = self.create_hierarchical_directory(article['source'], article_date)
+        
+        # Create filename from title with timestamp to ensure uniqueness
+        timestamp = article_date.strftime('%H%M%S')
+        filename = self.sanitize_filename(article['title'])
+        return day_dir, f"{filename}_{timestamp}"
+    
+    def article_path(self, article: Dict) -> str:
+        """Reserve the file path for an article not exported before"""
+        day_dir, stem = self.article_stem(article)
+        return self.reserve_filename(day_dir, f"{stem}.txt")
+    
+    def find_existing_file(self, article: Dict, content_hash: str) -> Optional[str]:
+        """
+        A text file already holding this article (same name or a numbered copy
+        of it, same content), written before the manifest existed. Only
+        candidate names from the cached listing are read.
+        """
+        day_dir, stem = self.article_stem(article)
+        entries = self.ensure_directory(day_dir)
+        with self._dir_lock:
+            candidates = sorted(name for name in entries
+                                if name == f"{stem}.txt" or (name.startswith(f"{stem}_") and name.endswith('.txt')))
+        
+        for name in candidates:
+            filepath = os.path.join(day_dir, name)
+            try:
+                with open(filepath, encoding='utf-8') as f:
+                    existing_hash = hashlib.sha1(f.read().encode('utf-8')).hexdigest()
+            except (OSError, UnicodeDecodeError):
+                continue
+            if existing_hash == content_hash:
+                return filepath
+        return None
+    
+    def write_file(self, filepath: str, content: str) -> Optional[str]:
+        """Write one article file; returns its path, or None on failure"""
         try:
-            # Parse article date
-            article_date = self.parse_article_date(article)
-            
-            # Create hierarchical directory
-            day_dir = self.create_hierarchical_directory(article['source'], article_date)
-            
-            # Create filename from title with timestamp to ensure uniqueness
-            timestamp = article_date.strftime('%H%M%S')
-            filename = self.sanitize_filename(article['title'])
-            filepath = os.path.join(day_dir, f"{filename}_{timestamp}.txt")
-            
-            # If file exists, add counter to make it unique
-            counter = 1
-            original_filepath = filepath
-            while os.path.exists(filepath):
-                name_parts = os.path.splitext(original_filepath)
-                filepath = f"{name_parts[0]}_{counter}{name_parts[1]}"
-                counter += 1
-            
-            # Create article content
-            content = self.format_article_content(article)
-            
-            # Write to file
             with open(filepath, 'w', encoding='utf-8') as f:
                 f.write(content)
             
             logger.debug(f"Saved article: {filepath}")
-            return True
+            return filepath
             
         except Exception as e:
             logger.error(f"Error saving article to file: {e}")
-            return False
+            return None
+    
+    def shard_path(self, article: Dict) -> str:
+        """Daily shard an article is appended to: Source/YYYY/MM/YYYY-MM-DD.jsonl.gz"""
+        article_date = self.parse_article_date(article)
+        # Shards live in the month directory; no per-day directory is created
+        month_dir = self.month_directory(article['source'], article_date)
+        self.ensure_directory(month_dir)
+        return os.path.join(month_dir, f"{article_date.strftime('%Y-%m-%d')}.jsonl.gz")
+    
+    def format_article_record(self, article: Dict) -> bytes:
+        """One shard record as a JSON line"""
+        record = {field: article.get(field) for field in ARTICLE_FIELDS}
+        return (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+    
+    def append_to_shard(self, shard_path: str, lines: List[bytes]) -> List[Optional[Tuple[int, int]]]:
+        """
+        Append records to a shard, each in its own gzip member so it can be read
+        alone (the shard still reads as one gzip stream); returns each record's
+        (byte offset, byte length)
+        """
+        try:
+            with open(shard_path, 'ab') as f:
+                offset = f.tell()
+                spans = []
+                for line in lines:
+                    member = gzip.compress(line, compresslevel=SHARD_COMPRESSLEVEL, mtime=0)
+                    f.write(member)
+                    spans.append((offset, len(member)))
+                    offset += len(member)
+            return spans
+        except Exception as e:
+            logger.error(f"Error appending to shard {shard_path}: {e}")
+            return [None] * len(lines)
+    
+    def read_shard_record(self, article_id: int) -> Optional[Dict]:
+        """Random read of one article exported to a shard, using the manifest's byte offset"""
+        exported = self.manifest.get(article_id)
+        if not exported or exported[2] is None:
+            return None
+        shard_path, _, offset, length = exported
+        with open(shard_path, 'rb') as f:
+            f.seek(offset)
+            member = f.read(length)
+        return json.loads(gzip.decompress(member))
+    
+    def write_batch(self, writes: List[Tuple[int, str, object]],
+                    pool: Optional[ThreadPoolExecutor]) -> Dict[int, Optional[Tuple[str, Optional[int], Optional[int]]]]:
+        """
+        Write (index, path, payload) items; returns index -> (path, offset, length), or None on failure.
+        Text files are written independently; records for the same shard are appended by one task.
+        """
+        groups: Dict[str, List[Tuple[int, object]]] = {}
+        for index, filepath, payload in writes:
+            groups.setdefault(filepath, []).append((index, payload))
+        
+        def write_group(group):
+            filepath, items = group
+            if self.output_format == 'jsonl':
+                spans = self.append_to_shard(filepath, [payload for _, payload in items])
+                return [(index, (filepath,) + span if span else None) for (index, _), span in zip(items, spans)]
+            results = []
+            for index, payload in items:
+                saved_path = self.write_file(filepath, payload)
+                results.append((index, (saved_path, None, None) if saved_path else None))
+            return results
+        
+        done = pool.map(write_group, groups.items()) if pool else map(write_group, groups.items())
+        return {index: result for group_results in done for index, result in group_results}
+    
+    def save_article_to_file(self, article: Dict, filepath: Optional[str] = None,
+                             content: Optional[str] = None) -> Optional[str]:
+        """
+        Save individual article to hierarchical folder structure; returns the file path.
+        An article already exported is rewritten in place at its recorded filepath.
+        """
+        try:
+            if filepath is None:
+                filepath = self.article_path(article)
+            else:
+                self.ensure_directory(os.path.dirname(filepath))
+            
+            # Create article content
+            if content is None:
+                content = self.format_article_content(article)
+            
+        except Exception as e:
+            logger.error(f"Error saving article to file: {e}")
+            return None
+        
+        return self.write_file(filepath, content)
     
     def format_article_content(self, article: Dict) -> str:
         """Format article content for text file"""
@@ -166,77 +394,46 @@ class NewsDataOrganizer:
         
         return "\n".join(content)
     
-    def get_all_articles(self) -> List[Dict]:
-        """Get all articles from database"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT title, description, content, url, source, published_at, collected_at
-                FROM news_articles 
-                ORDER BY collected_at DESC
-            ''')
-            
-            articles = []
-            for row in cursor.fetchall():
-                articles.append({
-                    'title': row[0],
-                    'description': row[1],
-                    'content': row[2],
-                    'url': row[3],
-                    'source': row[4],
-                    'published_at': row[5],
-                    'collected_at': row[6]
-                })
-            
-            conn.close()
-            logger.info(f"Retrieved {len(articles)} articles from database")
-            return articles
-            
-        except Exception as e:
-            logger.error(f"Error retrieving articles: {e}")
-            return []
+    def get_all_articles(self, columns: Optional[List[str]] = None, batch_size: int = 1000) -> Iterator[Dict]:
+        """Stream all articles from database (near duplicates of another article are skipped)"""
+        return self.store.iter_articles(
+            columns or ARTICLE_FIELDS,
+            order_by='collected_at',
+            batch_size=batch_size,
+            include_duplicates=False
+        )
     
-    def get_articles_since_date(self, since_date: datetime) -> List[Dict]:
-        """Get articles collected since specific date"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT title, description, content, url, source, published_at, collected_at
-                FROM news_articles 
-                WHERE collected_at >= ?
-                ORDER BY collected_at DESC
-            ''', (since_date.isoformat(),))
-            
-            articles = []
-            for row in cursor.fetchall():
-                articles.append({
-                    'title': row[0],
-                    'description': row[1],
-                    'content': row[2],
-                    'url': row[3],
-                    'source': row[4],
-                    'published_at': row[5],
-                    'collected_at': row[6]
-                })
-            
-            conn.close()
-            logger.info(f"Retrieved {len(articles)} articles since {since_date}")
-            return articles
-            
-        except Exception as e:
-            logger.error(f"Error retrieving articles: {e}")
-            return []
+    def get_articles_since_date(self, since_date: datetime, columns: Optional[List[str]] = None,
+                                batch_size: int = 1000) -> Iterator[Dict]:
+        """Stream articles collected since specific date (near duplicates are skipped)"""
+        return self.store.iter_articles(
+            columns or ARTICLE_FIELDS,
+            since=since_date,
+            order_by='collected_at',
+            batch_size=batch_size,
+            include_duplicates=False
+        )
     
-    def organize_all_data(self) -> Dict[str, int]:
-        """Organize all data into hierarchical folder structure"""
-        logger.info("Starting hierarchical data organization...")
+    def organize_all_data(self, verify: bool = False) -> Dict[str, int]:
+        """
+        Export articles added since the last run into the hierarchical folder structure.
+        verify=True re-checks every article, rewriting changed or missing files.
+        """
+        after_id = None if verify else self.manifest.watermark()
+        if after_id:
+            logger.info(f"Starting hierarchical data organization after article {after_id}...")
+        else:
+            logger.info("Starting hierarchical data organization...")
         
-        articles = self.get_all_articles()
-        return self.organize_articles(articles)
+        # Oldest first, so the watermark can advance as the export goes
+        articles = self.store.iter_articles(
+            ARTICLE_FIELDS,
+            order_by='id',
+            ascending=True,
+            after_id=after_id,
+            include_duplicates=False
+        )
+        return self.organize_articles(articles, verify=verify, advance_watermark=True)
     
     def organize_recent_data(self, days: int = 30) -> Dict[str, int]:
         """Organize recent data (last N days)"""
@@ -246,28 +443,126 @@ class NewsDataOrganizer:
         articles = self.get_articles_since_date(since_time)
         return self.organize_articles(articles)
     
-    def organize_articles(self, articles: List[Dict]) -> Dict[str, int]:
-        """Organize articles with hierarchical folder structure"""
-        if not articles:
-            logger.warning("No articles to organize")
-            return {}
-        
+    def organize_articles(self, articles: Iterable[Dict], verify: bool = False,
+                          advance_watermark: bool = False) -> Dict[str, int]:
+        """
+        Organize articles with hierarchical folder structure. Articles whose
+        exported output is unchanged (same content hash) are skipped, so running
+        it again over the same rows writes nothing. Files are written by the
+        thread pool a batch at a time; the manifest is updated after each batch.
+        A changed article is rewritten in place as a text file, or appended
+        again to its shard (the manifest then points at the newer record).
+        Text files left by an export from before the manifest are recorded
+        as they are instead of being written again.
+        """
         # Statistics tracking
         stats = {}
         total_saved = 0
+        total_seen = 0
+        unchanged = 0
+        adopted = 0
+        
+        # (article, file path, payload, content hash); payload is None for unchanged articles
+        batch = []
+        last_id = None
+        failed = False
+        pool = None
+        if self.write_workers > 1:
+            pool = ThreadPoolExecutor(max_workers=self.write_workers, thread_name_prefix='organizer-write')
         
-        # Process each article
-        for article in articles:
-            source = article['source']
+        def flush():
+            nonlocal batch, total_saved, last_id, failed
+            writes = [(index, filepath, payload) for index, (_, filepath, payload, _) in enumerate(batch)
+                      if filepath and payload is not None]
+            results = self.write_batch(writes, pool)
             
-            # Save article
-            if self.save_article_to_file(article):
-                total_saved += 1
-                stats[source] = stats.get(source, 0) + 1
-            else:
-                logger.warning(f"Failed to save article: {article.get('title', 'Unknown')}")
+            exported = []
+            for index, (article, filepath, payload, content_hash) in enumerate(batch):
+                if payload is not None:
+                    written = results.get(index)
+                    if not written:
+                        # The watermark stops at the first failure so that row is retried next run
+                        failed = True
+                        logger.warning(f"Failed to save article: {article.get('title', 'Unknown')}")
+                        continue
+                    total_saved += 1
+                    stats[article['source']] = stats.get(article['source'], 0) + 1
+                    exported.append((article['id'], written[0], content_hash, written[1], written[2]))
+                elif filepath:
+                    # Already on disk from an export before the manifest: record it, write nothing
+                    exported.append((article['id'], filepath, content_hash, None, None))
+                if not failed:
+                    last_id = article['id']
+            
+            if exported:
+                self.manifest.record_many(exported)
+            if advance_watermark and last_id is not None:
+                self.manifest.advance_watermark(last_id)
+            batch = []
         
-        logger.info(f"Data organization completed. Total articles saved: {total_saved}")
+        # Process each article as it streams in
+        try:
+            for article in articles:
+                total_seen += 1
+                
+                if self.output_format == 'jsonl':
+                    payload = self.format_article_record(article)
+                    content_hash = hashlib.sha1(payload).hexdigest()
+                else:
+                    payload = self.format_article_content(article)
+                    content_hash = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+                
+                filepath = None
+                exported = self.manifest.get(article['id'])
+                if exported:
+                    filepath, exported_hash, offset, length = exported
+                    if exported_hash == content_hash and (not verify or self.is_exported(filepath, offset, length)):
+                        unchanged += 1
+                        batch.append(({'id': article['id']}, None, None, None))
+                        continue
+                    if offset is not None or self.output_format == 'jsonl':
+                        # Shard records are appended, never rewritten in place
+                        filepath = None
+                
+                try:
+                    if self.output_format == 'jsonl':
+                        filepath = self.shard_path(article)
+                    elif filepath is None:
+                        existing = self.find_existing_file(article, content_hash)
+                        if existing:
+                            adopted += 1
+                            batch.append(({'id': article['id']}, existing, None, content_hash))
+                            if len(batch) >= MANIFEST_BATCH:
+                                flush()
+                            continue
+                        filepath = self.article_path(article)
+                    else:
+                        self.ensure_directory(os.path.dirname(filepath))
+                except Exception as e:
+                    logger.error(f"Error saving article to file: {e}")
+                    filepath = None
+                
+                batch.append((
+                    {'id': article['id'], 'source': article['source'], 'title': article.get('title')},
+                    filepath, payload, content_hash
+                ))
+                if len(batch) >= MANIFEST_BATCH:
+                    flush()
+        except Exception as e:
+            logger.error(f"Error retrieving articles: {e}")
+        finally:
+            try:
+                flush()
+            finally:
+                if pool:
+                    pool.shutdown(wait=True)
+        
+        if not total_seen:
+            logger.warning("No articles to organize")
+            return {}
+        
+        logger.info(f"Data organization completed. Total articles saved: {total_saved} "
+                    f"({unchanged} unchanged, {adopted} already on disk, of {total_seen})")
         
         # Log statistics by source
         for source, count in stats.items():
@@ -275,69 +570,45 @@ class NewsDataOrganizer:
         
         return stats
     
+    def is_exported(self, filepath: str, offset: Optional[int], length: Optional[int]) -> bool:
+        """Whether a manifest entry's file (or shard record) is still on disk"""
+        try:
+            size = os.path.getsize(filepath)
+        except OSError:
+            return False
+        return offset is None or size >= offset + length
+    
     def get_organization_statistics(self) -> Dict:
-        """Get detailed statistics about organized data"""
-        stats = {
-            'total_sources': 0,
-            'total_articles': 0,
-            'sources': {}
-        }
-        
-        if not os.path.exists(self.base_data_dir):
-            return stats
-        
-        # Walk through directory structure
-        for source_folder in os.listdir(self.base_data_dir):
-            source_path = os.path.join(self.base_data_dir, source_folder)
-            if os.path.isdir(source_path):
-                source_stats = {'total': 0, 'years': {}}
-                
-                # Count articles in each year/month/day
-                for year_folder in os.listdir(source_path):
-                    year_path = os.path.join(source_path, year_folder)
-                    if os.path.isdir(year_path):
-                        year_stats = {'total': 0, 'months': {}}
-                        
-                        for month_folder in os.listdir(year_path):
-                            month_path = os.path.join(year_path, month_folder)
-                            if os.path.isdir(month_path):
-                                month_stats = {'total': 0, 'days': {}}
-                                
-                                for day_folder in os.listdir(month_path):
-                                    day_path = os.path.join(month_path, day_folder)
-                                    if os.path.isdir(day_path):
-                                        file_count = len([f for f in os.listdir(day_path) if f.endswith('.txt')])
-                                        month_stats['days'][day_folder] = file_count
-                                        month_stats['total'] += file_count
-                                
-                                year_stats['months'][month_folder] = month_stats
-                                year_stats['total'] += month_stats['total']
-                        
-                        source_stats['years'][year_folder] = year_stats
-                        source_stats['total'] += year_stats['total']
-                
-                stats['sources'][source_folder] = source_stats
-                stats['total_articles'] += source_stats['total']
-        
-        stats['total_sources'] = len(stats['sources'])
-        return stats
+        """
+        Get detailed statistics about organized data, from the export manifest
+        (one indexed GROUP BY, no filesystem access). A tree exported before
+        the manifest existed is counted on disk until an export records it.
+        """
+        counts = self.manifest.counts()
+        if not counts:
+            return self.scan_organization_statistics()
+        return organization_statistics(counts)
+    
+    def scan_organization_statistics(self) -> Dict:
+        """Statistics by walking the text layout on disk (for trees exported before the manifest)"""
+        return scan_organization_statistics(self.base_data_dir)
 
 # Integration functions
-def organize_all_scraped_data():
+def organize_all_scraped_data(verify: bool = False, output_format: str = 'txt'):
     """Organize all scraped data into hierarchical folder structure"""
     logger.info("Starting full data organization...")
     
-    organizer = NewsDataOrganizer()
-    stats = organizer.organize_all_data()
+    organizer = NewsDataOrganizer(output_format=output_format)
+    stats = organizer.organize_all_data(verify=verify)
     
     logger.info("Full data organization completed!")
     return stats
 
-def organize_recent_scraped_data(days: int = 30):
+def organize_recent_scraped_data(days: int = 30, output_format: str = 'txt'):
     """Organize recent scraped data"""
     logger.info(f"Starting recent data organization (last {days} days)...")
     
-    organizer = NewsDataOrganizer()
+    organizer = NewsDataOrganizer(output_format=output_format)
     stats = organizer.organize_recent_data(days)
     
     logger.info("Recent data organization completed!")
@@ -0,0 +1,157 @@
+# db/dedup.py
+import re
+import hashlib
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Word shingles hashed into a 64-bit SimHash
+SHINGLE_SIZE = 4
+# Articles with fewer words than this are too short to fingerprint reliably
+MIN_TOKENS = 30
+# The fingerprint is split into BANDS of BAND_BITS for locality-sensitive lookup.
+# Two fingerprints within MAX_DISTANCE < BANDS bits must share at least one band.
+BANDS = 4
+BAND_BITS = 16
+MAX_DISTANCE = 3
+
+WORD = re.compile(r'\w+')
+
+INSERT_FINGERPRINT_SQL = f'''
+    INSERT OR REPLACE INTO article_fingerprints
+    (article_id, simhash, {', '.join(f'band{band}' for band in range(BANDS))})
+    VALUES (?, ?, {', '.join('?' for _ in range(BANDS))})
+'''
+
+
+def simhash(text: str, shingle_size: int = SHINGLE_SIZE) -> Optional[int]:
+    """64-bit SimHash of a text's word shingles, or None if the text is too short"""
+    tokens = WORD.findall((text or '').lower())
+    if len(tokens) < MIN_TOKENS:
+        return None
+
+    shingles = {' '.join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)}
+    bits = [format(int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big'), '064b')
+            for shingle in shingles]
+
+    # Majority vote per bit position (column-wise over the binary strings)
+    threshold = len(bits) / 2
+    fingerprint = 0
+    for column in zip(*bits):
+        fingerprint = fingerprint << 1 | (column.count('1') > threshold)
+    return fingerprint
+
+
+def to_signed(value: int) -> int:
+    """SQLite integers are signed 64-bit"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+def band_values(fingerprint: int) -> list:
+    mask = (1 << BAND_BITS) - 1
+    return [(fingerprint >> (band * BAND_BITS)) & mask for band in range(BANDS)]
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class NearDuplicateIndex:
+    def __init__(self, store, max_distance: int = MAX_DISTANCE):
+        """
+        SimHash fingerprints of stored articles, banded for LSH lookups, so
+        wire stories republished under different URLs can be linked to the
+        first stored copy (news_articles.canonical_id)
+        """
+        self.store = store
+        self.max_distance = max_distance
+        self.setup_schema()
+
+    def setup_schema(self):
+        """Create the fingerprint table and one index per band"""
+        band_columns = ', '.join(f'band{band} INTEGER NOT NULL' for band in range(BANDS))
+        self.store.execute(f'''
+            CREATE TABLE IF NOT EXISTS article_fingerprints (
+                article_id INTEGER PRIMARY KEY,
+                simhash INTEGER NOT NULL,
+                {band_columns}
+            )
+        ''')
+        for band in range(BANDS):
+            self.store.execute(f'CREATE INDEX IF NOT EXISTS idx_fingerprint_band{band} ON article_fingerprints(band{band})')
+        # Highest article id index_existing has looked at, fingerprinted or not
+        self.store.execute('''
+            CREATE TABLE IF NOT EXISTS fingerprint_watermark (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                last_article_id INTEGER NOT NULL
+            )
+        ''')
+
+    def find_canonical(self, fingerprint: int) -> Optional[int]:
+        """Oldest indexed article within max_distance bits of the fingerprint"""
+        where = ' OR '.join(f'band{band} = ?' for band in range(BANDS))
+        rows = self.store.conn.execute(
+            f'SELECT article_id, simhash FROM article_fingerprints WHERE {where} ORDER BY article_id',
+            tuple(band_values(fingerprint))
+        ).fetchall()
+        for article_id, stored in rows:
+            if hamming_distance(fingerprint, to_unsigned(stored)) <= self.max_distance:
+                return article_id
+        return None
+
+    def register(self, article_id: int, fingerprint: Optional[int]) -> Optional[int]:
+        """
+        Index a newly stored article, or link it to the article it duplicates.
+        Runs on the store connection; call inside ArticleStore.transaction().
+        Returns the canonical article id for near duplicates.
+        """
+        if fingerprint is None:
+            return None
+
+        canonical_id = self.find_canonical(fingerprint)
+        if canonical_id is not None:
+            self.store.conn.execute('UPDATE news_articles SET canonical_id = ? WHERE id = ?', (canonical_id, article_id))
+            return canonical_id
+
+        # Only canonical copies are indexed, so every duplicate links to the original
+        self.store.conn.execute(INSERT_FINGERPRINT_SQL, (article_id, to_signed(fingerprint), *band_values(fingerprint)))
+        return None
+
+    def watermark(self) -> int:
+        row = self.store.query_one('SELECT last_article_id FROM fingerprint_watermark WHERE id = 1')
+        return row[0] if row else 0
+
+    def index_existing(self, batch_size: int = 1000) -> int:
+        """
+        Fingerprint stored articles that predate the index; returns duplicates
+        found. Articles too short to fingerprint have no row to mark them, so
+        progress is kept as an id watermark and each article is read only once.
+        """
+        duplicates = 0
+        last_id = self.watermark()
+        while True:
+            rows = self.store.query('''
+                SELECT a.id, a.content, a.content_codec FROM news_articles a
+                LEFT JOIN article_fingerprints f ON f.article_id = a.id
+                WHERE a.id > ? AND f.article_id IS NULL AND a.canonical_id IS NULL
+                ORDER BY a.id LIMIT ?
+            ''', (last_id, batch_size))
+            if not rows:
+                break
+            with self.store.transaction():
+                for article_id, content, codec in rows:
+                    content = self.store.content_codec.decode(content, codec)
+                    if self.register(article_id, simhash(content)) is not None:
+                        duplicates += 1
+                last_id = rows[-1][0]
+                self.store.conn.execute('''
+                    INSERT INTO fingerprint_watermark (id, last_article_id) VALUES (1, ?)
+                    ON CONFLICT(id) DO UPDATE SET last_article_id = MAX(last_article_id, excluded.last_article_id)
+                ''', (last_id,))
+            logger.info(f"Fingerprinted articles up to id {last_id} ({duplicates} duplicates so far)")
+        return duplicates
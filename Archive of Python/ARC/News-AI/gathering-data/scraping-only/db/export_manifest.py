@@ -0,0 +1,125 @@
+# db/export_manifest.py
+import os
+import sqlite3
+import logging
+from typing import List, Optional, Tuple
+from db.article_store import ArticleStore
+
+logger = logging.getLogger(__name__)
+
+COUNTS_SQL = '''
+    SELECT source_dir, article_day, COUNT(*) FROM organized_files
+    WHERE base_dir = ? AND source_dir IS NOT NULL
+    GROUP BY source_dir, article_day
+'''
+
+
+def read_manifest_counts(conn: sqlite3.Connection, base_data_dir: str) -> List[Tuple[str, str, int]]:
+    """ExportManifest.counts() over any connection (e.g. read-only); empty if nothing was exported yet"""
+    try:
+        return conn.execute(COUNTS_SQL, (os.path.abspath(base_data_dir),)).fetchall()
+    except sqlite3.OperationalError:
+        # No manifest table in this database yet
+        return []
+
+
+class ExportManifest:
+    def __init__(self, store: ArticleStore, base_data_dir: str):
+        """
+        Record of the files the organizer wrote under one output directory:
+        article id -> file path and content hash (and for packed shards, the
+        byte offset and length of the article's record), plus the highest article id
+        the full export has reached. Re-running an export only writes rows
+        that are new or whose formatted output changed.
+        """
+        self.store = store
+        self.base_dir = os.path.abspath(base_data_dir)
+        self.setup_schema()
+
+    def setup_schema(self):
+        """Create the manifest and watermark tables"""
+        self.store.execute('''
+            CREATE TABLE IF NOT EXISTS organized_files (
+                base_dir TEXT NOT NULL,
+                article_id INTEGER NOT NULL,
+                file_path TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                byte_offset INTEGER,
+                byte_length INTEGER,
+                source_dir TEXT,
+                article_day TEXT,
+                exported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (base_dir, article_id)
+            )
+        ''')
+        columns = [row[1] for row in self.store.query('PRAGMA table_info(organized_files)')]
+        for column, column_type in (('byte_offset', 'INTEGER'), ('byte_length', 'INTEGER'),
+                                    ('source_dir', 'TEXT'), ('article_day', 'TEXT')):
+            if column not in columns:
+                self.store.execute(f'ALTER TABLE organized_files ADD COLUMN {column} {column_type}')
+        # Covers the statistics GROUP BY, so it never reads the table itself
+        self.store.execute('''
+            CREATE INDEX IF NOT EXISTS idx_organized_location
+            ON organized_files(base_dir, source_dir, article_day)
+        ''')
+        self.fill_locations()
+        self.store.execute('''
+            CREATE TABLE IF NOT EXISTS organizer_watermarks (
+                base_dir TEXT PRIMARY KEY,
+                last_article_id INTEGER NOT NULL
+            )
+        ''')
+
+    def location(self, file_path: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        (source folder, YYYY-MM-DD) of an exported path, either
+        Source/YYYY/MM/DD/<file>.txt or Source/YYYY/MM/YYYY-MM-DD.jsonl.gz
+        """
+        parts = os.path.relpath(os.path.abspath(file_path), self.base_dir).split(os.sep)
+        if len(parts) == 5:
+            return parts[0], f"{parts[1]}-{parts[2]}-{parts[3]}"
+        if len(parts) == 4:
+            return parts[0], parts[3].split('.', 1)[0]
+        return None, None
+
+    def fill_locations(self):
+        """Derive source folder and day for entries recorded before those columns existed"""
+        rows = self.store.query(
+            'SELECT article_id, file_path FROM organized_files WHERE base_dir = ? AND source_dir IS NULL',
+            (self.base_dir,)
+        )
+        if rows:
+            self.store.executemany(
+                'UPDATE organized_files SET source_dir = ?, article_day = ? WHERE base_dir = ? AND article_id = ?',
+                [self.location(file_path) + (self.base_dir, article_id) for article_id, file_path in rows]
+            )
+
+    def get(self, article_id: int) -> Optional[Tuple[str, str, Optional[int], Optional[int]]]:
+        """(file path, content hash, byte offset, byte length) an article was exported with"""
+        return self.store.query_one('''
+            SELECT file_path, content_hash, byte_offset, byte_length FROM organized_files
+            WHERE base_dir = ? AND article_id = ?
+        ''', (self.base_dir, article_id))
+
+    def record_many(self, entries: List[Tuple[int, str, str, Optional[int], Optional[int]]]):
+        """Register exported (article id, file path, content hash, byte offset, byte length) entries"""
+        self.store.executemany('''
+            INSERT OR REPLACE INTO organized_files
+            (base_dir, article_id, file_path, content_hash, byte_offset, byte_length, source_dir, article_day)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(self.base_dir,) + tuple(entry) + self.location(entry[1]) for entry in entries])
+
+    def counts(self) -> List[Tuple[str, str, int]]:
+        """(source folder, YYYY-MM-DD, articles) for everything exported under this directory"""
+        return self.store.query(COUNTS_SQL, (self.base_dir,))
+
+    def watermark(self) -> int:
+        """Highest article id the full export has processed"""
+        row = self.store.query_one('SELECT last_article_id FROM organizer_watermarks WHERE base_dir = ?', (self.base_dir,))
+        return row[0] if row else 0
+
+    def advance_watermark(self, article_id: int):
+        self.store.execute('''
+            INSERT INTO organizer_watermarks (base_dir, last_article_id) VALUES (?, ?)
+            ON CONFLICT(base_dir) DO UPDATE SET last_article_id = MAX(last_article_id, excluded.last_article_id)
+        ''', (self.base_dir, article_id))
@@ -1,16 +1,46 @@
 # db/historical_collector.py
-import requests
-from bs4 import BeautifulSoup
+import gzip
+import itertools
 import logging
-from datetime import datetime, timedelta
-import time
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import List, Dict, Iterator, Optional, Tuple
 import random
 
 logger = logging.getLogger(__name__)
 
+# Sitemap indexes can nest; stop following them past this depth
+MAX_SITEMAP_DEPTH = 3
+
+
+def local_name(tag: str) -> str:
+    """Strip the XML namespace from an element tag"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_sitemap_date(value: Optional[str]) -> Optional[datetime]:
+    """Parse a W3C datetime from <lastmod> or <news:publication_date> (naive, date precision kept)"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.strip().replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def month_bounds(target_date: datetime) -> Tuple[datetime, datetime]:
+    """First instant of the target month and of the month after it"""
+    start = datetime(target_date.year, target_date.month, 1)
+    if target_date.month == 12:
+        return start, datetime(target_date.year + 1, 1, 1)
+    return start, datetime(target_date.year, target_date.month + 1, 1)
+
 class HistoricalDataCollector:
     def __init__(self, scraper_instance):
         self.scraper = scraper_instance
+        # Sitemaps go through the scraper's fetch engine: same keep-alive sessions,
+        # rate limits, robots.txt crawl delay and Retry-After handling as its pages
+        self.fetch_engine = scraper_instance.fetch_engine
         self.user_agents = [
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
@@ -22,39 +52,91 @@ class HistoricalDataCollector:
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
         }
     
-    def scrape_sitemap(self, base_url: str, target_date: datetime) -> List[str]:
-        """Scrape sitemap for articles from specific date"""
+    def iter_sitemap_urls(self, sitemap_url: str, since: Optional[datetime] = None,
+                          until: Optional[datetime] = None, depth: int = 0) -> Iterator[str]:
+        """
+        Stream article URLs out of a sitemap with iterparse, recursing into
+        sitemap indexes. Entries whose lastmod (or news publication date)
+        falls outside [since, until) are skipped; entries without one are kept.
+        """
+        child_sitemaps = []
         try:
-            # Try common sitemap locations
-            sitemap_urls = [
-                f"{base_url}/sitemap.xml",
-                f"{base_url}/sitemap_index.xml",
-                f"{base_url}/news-sitemap.xml",
-                f"{base_url}/sitemap-{target_date.strftime('%Y-%m-%d')}.xml"
-            ]
+            headers = self.get_random_headers()
+            response = self.fetch_engine.request(sitemap_url, headers=headers, stream=True, timeout=10)
+            if response.status_code != 200:
+                response.close()
+                return
             
-            for sitemap_url in sitemap_urls:
-                try:
-                    headers = self.get_random_headers()
-                    response = requests.get(sitemap_url, headers=headers, timeout=10)
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'xml')
-                        urls = []
-                        
-                        # Extract URLs from sitemap
-                        for loc in soup.find_all('loc'):
-                            url = loc.get_text()
-                            # Filter by date if possible
-                            urls.append(url)
-                        
-                        return urls[:50]  # Limit to 50 URLs
-                except:
-                    continue
+            response.raw.decode_content = True
+            stream = gzip.GzipFile(fileobj=response.raw) if sitemap_url.endswith('.gz') else response.raw
+            
+            root = None
+            with response:
+                for event, elem in ET.iterparse(stream, events=('start', 'end')):
+                    if root is None:
+                        root = elem
+                    if event != 'end':
+                        continue
+                    
+                    tag = local_name(elem.tag)
+                    if tag not in ('url', 'sitemap'):
+                        continue
                     
+                    loc, modified = None, None
+                    for child in elem.iter():
+                        child_tag = local_name(child.tag)
+                        if child_tag == 'loc':
+                            loc = (child.text or '').strip()
+                        elif child_tag == 'publication_date' or (child_tag == 'lastmod' and modified is None):
+                            modified = parse_sitemap_date(child.text)
+                    
+                    # Drop parsed entries so memory stays flat on huge sitemaps
+                    root.clear()
+                    
+                    if not loc:
+                        continue
+                    if tag == 'sitemap':
+                        # A child sitemap last modified before the window cannot hold entries inside it
+                        if since is None or modified is None or modified >= since:
+                            child_sitemaps.append(loc)
+                    elif modified is None or ((since is None or modified >= since) and (until is None or modified < until)):
+                        yield loc
+        
         except Exception as e:
-            logger.error(f"Error scraping sitemap: {e}")
+            logger.debug(f"Error reading sitemap {sitemap_url}: {e}")
+        
+        # Children are read after the parent so only one connection is held at a time
+        if depth < MAX_SITEMAP_DEPTH:
+            for child_url in child_sitemaps:
+                yield from self.iter_sitemap_urls(child_url, since, until, depth + 1)
+    
+    def iter_month_urls(self, base_url: str, target_date: datetime) -> Iterator[str]:
+        """Article URLs from the first common sitemap location that has any for the target month"""
+        since, until = month_bounds(target_date)
         
-        return []
+        # Try common sitemap locations
+        sitemap_urls = [
+            f"{base_url}/sitemap.xml",
+            f"{base_url}/sitemap_index.xml",
+            f"{base_url}/news-sitemap.xml",
+            f"{base_url}/sitemap-{target_date.strftime('%Y-%m-%d')}.xml"
+        ]
+        
+        for sitemap_url in sitemap_urls:
+            found = False
+            for url in self.iter_sitemap_urls(sitemap_url, since, until):
+                found = True
+                yield url
+            if found:
+                return
+    
+    def scrape_sitemap(self, base_url: str, target_date: datetime) -> List[str]:
+        """Scrape sitemap for articles from the target date's month"""
+        try:
+            return list(itertools.islice(self.iter_month_urls(base_url, target_date), 50))  # Limit to 50 URLs
+        except Exception as e:
+            logger.error(f"Error scraping sitemap: {e}")
+            return []
     
     def collect_monthly_data(self, source_config: Dict, year: int, month: int) -> List[Dict]:
         """Collect data for a specific month"""
@@ -71,19 +153,18 @@ class HistoricalDataCollector:
                         target_date = datetime(year, month, day)
                         archive_articles = self.scraper.scrape_historical_archive(source_config, target_date)
                         articles.extend(archive_articles)
-                        time.sleep(2)
                     except:
                         continue
             
             # 2. Try sitemap approach
-            sitemap_urls = self.scrape_sitemap(source_config['base_url'], datetime(year, month, 1))
-            for url in sitemap_urls[:10]:  # Limit to 10 URLs
+            sitemap_urls = self.iter_month_urls(source_config['base_url'], datetime(year, month, 1))
+            new_urls = (url for url in sitemap_urls if url not in self.scraper.known_urls)
+            for url in itertools.islice(new_urls, 10):  # Limit to 10 URLs
                 try:
                     article_data = self.scraper.scrape_article(url, source_config)
                     if article_data:
                         article_data['collection_method'] = 'sitemap'
                         articles.append(article_data)
-                    time.sleep(1)
                 except:
                     continue
                     
@@ -124,7 +205,6 @@ def collect_10_years_data():
                     stored_count = scraper.store_articles(monthly_articles)
                     total_articles += stored_count
                     print(f"    {source['name']}: {stored_count} articles")
-                    time.sleep(3)  # Be respectful
                 except Exception as e:
                     logger.error(f"Error collecting {source['name']} data: {e}")
     
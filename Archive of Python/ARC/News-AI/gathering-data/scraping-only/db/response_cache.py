@@ -0,0 +1,138 @@
+# db/response_cache.py
+import os
+import sqlite3
+import threading
+import time
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Entries not fetched or revalidated for this long are dropped
+DEFAULT_MAX_AGE = 30 * 24 * 3600
+# Total size of cached bodies; beyond it the least recently revalidated bodies are dropped
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Stores between two prunes
+PRUNE_EVERY = 500
+
+
+class ResponseCache:
+    def __init__(self, db_path: str = os.path.join("db", "http_cache.db"),
+                 max_age: float = DEFAULT_MAX_AGE, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Persistent HTTP response cache keyed by URL. Stores validators
+        (ETag / Last-Modified) so pages can be revalidated with a conditional GET,
+        and the page body where it will be needed again. Entries older than
+        max_age are pruned, and bodies beyond max_bytes in total are dropped
+        oldest first (their validators are kept).
+        """
+        self.db_path = db_path
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stores = 0
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.setup_database()
+        self.prune()
+
+    def setup_database(self):
+        """Create the cache table"""
+        with self._lock:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    content BLOB,
+                    fetched_at REAL
+                )
+            ''')
+            self.conn.commit()
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Return the cached entry for a URL, or None ('content' is None for validator-only entries)"""
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT etag, last_modified, content, fetched_at FROM http_cache WHERE url = ?', (url,)
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            'etag': row[0],
+            'last_modified': row[1],
+            'content': row[2],
+            'fetched_at': row[3]
+        }
+
+    def is_fresh(self, entry: Dict, ttl: float) -> bool:
+        """True if the entry is younger than ttl seconds"""
+        return ttl > 0 and (time.time() - entry['fetched_at']) < ttl
+
+    def conditional_headers(self, entry: Dict) -> Dict[str, str]:
+        """Validators to send when revalidating a cached entry"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url: str, content: Optional[bytes], etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Insert or replace the cached entry for a URL (content None keeps the validators only)"""
+        if content is None and not etag and not last_modified:
+            # Nothing to revalidate with
+            self.forget(url)
+            return
+        with self._lock:
+            self.conn.execute('''
+                INSERT OR REPLACE INTO http_cache (url, etag, last_modified, content, fetched_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (url, etag, last_modified, content, time.time()))
+            self.conn.commit()
+            self._stores += 1
+            due = self._stores % PRUNE_EVERY == 0
+        if due:
+            self.prune()
+
+    def forget(self, url: str):
+        """Drop a URL's entry, e.g. once its page will not be read again"""
+        with self._lock:
+            self.conn.execute('DELETE FROM http_cache WHERE url = ?', (url,))
+            self.conn.commit()
+
+    def prune(self):
+        """Drop entries older than max_age, then the oldest bodies while the total is over max_bytes"""
+        with self._lock:
+            expired = self.conn.execute(
+                'DELETE FROM http_cache WHERE fetched_at < ?', (time.time() - self.max_age,)
+            ).rowcount
+            total = self.conn.execute('SELECT COALESCE(SUM(LENGTH(content)), 0) FROM http_cache').fetchone()[0]
+            dropped = 0
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                rows = self.conn.execute(
+                    'SELECT url, LENGTH(content) FROM http_cache WHERE content IS NOT NULL ORDER BY fetched_at'
+                )
+                urls = []
+                for url, size in rows:
+                    if excess <= 0:
+                        break
+                    urls.append((url,))
+                    excess -= size
+                self.conn.executemany('UPDATE http_cache SET content = NULL WHERE url = ?', urls)
+                dropped = len(urls)
+            self.conn.commit()
+        if expired or dropped:
+            logger.info(f"Response cache pruned: {expired} expired entries, {dropped} bodies over the size limit")
+
+    def touch(self, url: str):
+        """Mark a cached entry as just revalidated (304 Not Modified)"""
+        with self._lock:
+            self.conn.execute('UPDATE http_cache SET fetched_at = ? WHERE url = ?', (time.time(), url))
+            self.conn.commit()
+
+    def close(self):
+        """Close the cache database"""
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,126 @@
+# db/search_index.py
+import re
+import sqlite3
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'news_articles_fts'
+# bm25 column weights: a hit in the title counts more than one in the body
+RANK_WEIGHTS = (10.0, 3.0, 1.0)
+
+INSERT_FTS_SQL = f'INSERT INTO {FTS_TABLE} (rowid, title, description, content) VALUES (?, ?, ?, ?)'
+
+TERM = re.compile(r'\w+', re.UNICODE)
+# FTS5 operators (case-sensitive); left over from a broken query they are not search terms
+OPERATORS = {'AND', 'OR', 'NOT', 'NEAR'}
+
+
+def quote_terms(query: str) -> str:
+    """Turn free text into an FTS5 query of quoted terms (all must match), dropping bare operators"""
+    return ' '.join(f'"{term}"' for term in TERM.findall(query) if term not in OPERATORS)
+
+
+class ArticleSearchIndex:
+    def __init__(self, store):
+        """
+        FTS5 full-text index over article title, description and content.
+        The table is contentless (rowid = news_articles.id): it only holds the
+        inverted index, and results are read back from news_articles.
+        """
+        self.store = store
+        self.setup_schema()
+        self.index_missing()
+
+    def setup_schema(self):
+        """Create the FTS5 table"""
+        self.store.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE}
+            USING fts5(title, description, content, content='', tokenize='porter unicode61')
+        ''')
+
+    def add(self, article_id: int, article: Dict):
+        """Index one stored article; call inside ArticleStore.transaction()"""
+        self.store.conn.execute(INSERT_FTS_SQL, (
+            article_id,
+            article.get('title') or '',
+            article.get('description') or '',
+            article.get('content') or ''
+        ))
+
+    def index_missing(self, batch_size: int = 1000) -> int:
+        """Index articles stored after the newest indexed row (e.g. before the index existed)"""
+        row = self.store.query_one(f'SELECT rowid FROM {FTS_TABLE} ORDER BY rowid DESC LIMIT 1')
+        last_id = row[0] if row else 0
+        indexed = 0
+
+        while True:
+            rows = self.store.query('''
+                SELECT id, title, description, content, content_codec FROM news_articles
+                WHERE id > ? ORDER BY id LIMIT ?
+            ''', (last_id, batch_size))
+            if not rows:
+                break
+            indexed_rows = []
+            for article_id, title, description, content, codec in rows:
+                description, content = self.store.decode_article(description, content, codec)
+                indexed_rows.append((article_id, title or '', description or '', content or ''))
+            with self.store.transaction() as conn:
+                conn.executemany(INSERT_FTS_SQL, indexed_rows)
+            indexed += len(rows)
+            last_id = rows[-1][0]
+
+        if indexed:
+            logger.info(f"Added {indexed} articles to the full-text index")
+        return indexed
+
+    def search(self, query: str, source: Optional[str] = None, since: Optional[datetime] = None,
+               page: int = 1, per_page: int = 20, include_duplicates: bool = False) -> List[Dict]:
+        """Articles matching an FTS5 query, best bm25 rank first"""
+        conditions = [f'{FTS_TABLE} MATCH ?']
+        params: list = []
+        if source:
+            conditions.append('a.source = ?')
+            params.append(source)
+        if since:
+            conditions.append('a.published_at >= ?')
+            params.append(since.isoformat())
+        if not include_duplicates:
+            conditions.append('a.canonical_id IS NULL')
+
+        sql = f'''
+            SELECT a.id, a.title, a.description, a.url, a.source, a.published_at,
+                   a.content, a.content_codec, bm25({FTS_TABLE}, {', '.join(str(weight) for weight in RANK_WEIGHTS)}) AS rank
+            FROM {FTS_TABLE}
+            JOIN news_articles a ON a.id = {FTS_TABLE}.rowid
+            WHERE {' AND '.join(conditions)}
+            ORDER BY rank
+            LIMIT ? OFFSET ?
+        '''
+        paging = [per_page, (max(page, 1) - 1) * per_page]
+
+        try:
+            rows = self.store.query(sql, tuple([query] + params + paging))
+        except sqlite3.OperationalError as e:
+            # Not valid FTS5 syntax (stray quotes, operators...): search the plain terms instead
+            logger.debug(f"Query {query!r} is not valid FTS5 syntax ({e}), retrying as plain terms")
+            plain = quote_terms(query)
+            if not plain:
+                return []
+            rows = self.store.query(sql, tuple([plain] + params + paging))
+
+        results = []
+        for row in rows:
+            description, _ = self.store.decode_article(row[2], row[6], row[7])
+            results.append({
+                'id': row[0],
+                'title': row[1],
+                'description': description,
+                'url': row[3],
+                'source': row[4],
+                'published_at': row[5],
+                'rank': row[8]
+            })
+        return results
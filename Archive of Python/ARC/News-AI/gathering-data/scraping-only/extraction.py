@@ -0,0 +1,169 @@
+# extraction.py
+import re
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve as sv
+from db.compression import derive_description
+from db.dedup import simhash
+
+logger = logging.getLogger(__name__)
+
+# lxml is much faster than the pure-Python parser; use it whenever it is installed
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = 'lxml'
+except ImportError:
+    DEFAULT_PARSER = 'html.parser'
+
+# Tags kept for the paragraph fallback when no content selector matches
+FALLBACK_TAGS = ['p']
+
+TAG_NAME = re.compile(r'^[a-zA-Z][a-zA-Z0-9-]*')
+
+
+def split_selector_list(selector: str) -> List[str]:
+    """Split a selector list on top-level commas (not inside [...] or quotes)"""
+    parts, current, depth, quote = [], [], 0, None
+    for char in selector:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ('"', "'"):
+            quote = char
+        elif char in '[(':
+            depth += 1
+        elif char in '])':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(''.join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    parts.append(''.join(current).strip())
+    return [part for part in parts if part]
+
+
+def selector_root_tag(selector: str) -> Optional[str]:
+    """
+    Tag name of the outermost compound selector, e.g. 'div' for
+    'div[data-x="a b"] > p'. None when that compound has no tag name.
+    """
+    match = TAG_NAME.match(selector.strip())
+    return match.group(0).lower() if match else None
+
+
+def build_strainer(selectors: List[str]) -> Optional[SoupStrainer]:
+    """
+    SoupStrainer keeping only the subtrees the selectors can match in.
+    Returns None (parse everything) if any selector lacks a root tag name.
+    """
+    tags = set()
+    for selector in selectors:
+        for part in split_selector_list(selector):
+            tag = selector_root_tag(part)
+            if not tag:
+                return None
+            tags.add(tag)
+    return SoupStrainer(name=sorted(tags))
+
+
+class SourceExtractor:
+    def __init__(self, source_config: Dict, parser: Optional[str] = None):
+        """
+        Precompiled selectors and parse strainers for one news source.
+        The parser backend can be chosen per source with a 'parser' key.
+        """
+        selectors = source_config.get('selectors', {})
+        self.source_name = source_config.get('name', 'Unknown')
+        self.parser = source_config.get('parser') or parser or DEFAULT_PARSER
+
+        link_selector = selectors.get('article_links', 'a')
+        title_selector = selectors.get('title', 'h1')
+        content_selectors = selectors.get('content', [])
+        if isinstance(content_selectors, str):
+            content_selectors = [content_selectors]
+
+        self.link_selector = sv.compile(link_selector)
+        self.title_selector = sv.compile(title_selector)
+        self.content_selectors = [sv.compile(selector) for selector in content_selectors]
+
+        self.listing_strainer = build_strainer([link_selector])
+        self.article_strainer = build_strainer([title_selector] + content_selectors + FALLBACK_TAGS)
+
+    def parse(self, html: bytes, strainer: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        """Parse markup with this source's backend, optionally only the strained subtrees"""
+        return BeautifulSoup(html, self.parser, parse_only=strainer)
+
+    def extract_links(self, html: bytes) -> List[str]:
+        """All href values matched by the article link selector"""
+        soup = self.parse(html, self.listing_strainer)
+        return [link.get('href') for link in self.link_selector.select(soup) if link.get('href')]
+
+    def extract_fields(self, soup: BeautifulSoup) -> Tuple[Optional[str], str]:
+        """Title and body text from a parsed article"""
+        title_elem = self.title_selector.select_one(soup)
+        title = title_elem.get_text().strip() if title_elem else None
+
+        content = ""
+        # Try multiple content selectors
+        for selector in self.content_selectors:
+            content_elements = selector.select(soup)
+            if content_elements:
+                content = ' '.join([elem.get_text().strip() for elem in content_elements])
+                break
+
+        # Fallback to paragraphs if no specific content selector works
+        if not content:
+            paragraphs = soup.find_all('p')
+            content = ' '.join([p.get_text().strip() for p in paragraphs[:20]])
+
+        return title, content
+
+    def extract_article(self, html: bytes) -> Tuple[str, str]:
+        """Title and body text; reparses the full page if the strained parse found nothing"""
+        title, content = self.extract_fields(self.parse(html, self.article_strainer))
+        if self.article_strainer is not None and not title and not content:
+            title, content = self.extract_fields(self.parse(html))
+        return title or "No title", content
+
+
+_extractors: Dict[str, SourceExtractor] = {}
+_extractors_lock = threading.Lock()
+
+
+def get_extractor(source_config: Dict) -> SourceExtractor:
+    """Compiled extractor for a source, built once per process"""
+    name = source_config.get('name', 'Unknown')
+    with _extractors_lock:
+        extractor = _extractors.get(name)
+        if extractor is None:
+            extractor = SourceExtractor(source_config)
+            _extractors[name] = extractor
+        return extractor
+
+
+def extract_article_data(url: str, html: bytes, source_config: Dict) -> Optional[Dict]:
+    """Build the article record for a downloaded page"""
+    try:
+        title, content = get_extractor(source_config).extract_article(html)
+
+        # Extract description (first part of content)
+        description = derive_description(content)
+
+        return {
+            'title': title,
+            'description': description,
+            'content': content,
+            'url': url,
+            'source': source_config.get('name', 'Unknown'),
+            'published_at': datetime.now().isoformat(),
+            # Fingerprinted here so the hashing runs in the parse workers, not the writer
+            'simhash': simhash(content)
+        }
+
+    except Exception as e:
+        logger.error(f"Error scraping article {url}: {e}")
+        return None
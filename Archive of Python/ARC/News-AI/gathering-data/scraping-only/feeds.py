@@ -0,0 +1,89 @@
+# feeds.py
+import html
+import io
+import re
+import logging
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+TAG_PATTERN = re.compile(r'<[^>]+>')
+WHITESPACE = re.compile(r'\s+')
+
+
+def local_name(tag: str) -> str:
+    """Strip the XML namespace from an element tag"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def strip_markup(text: Optional[str]) -> str:
+    """Plain text from a feed summary that may carry escaped HTML"""
+    if not text:
+        return ''
+    return WHITESPACE.sub(' ', html.unescape(TAG_PATTERN.sub(' ', text))).strip()
+
+
+def parse_feed_date(value: Optional[str]) -> Optional[str]:
+    """ISO timestamp from an RSS (RFC 822) or Atom (RFC 3339) date"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return parsedate_to_datetime(value).isoformat()
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).isoformat()
+    except ValueError:
+        return None
+
+
+def entry_fields(elem: ET.Element) -> Dict:
+    """Title, link, publish date and summary of one <item> or <entry>"""
+    entry = {'title': None, 'link': None, 'published_at': None, 'summary': None}
+    updated = None
+
+    for child in elem:
+        tag = local_name(child.tag)
+        if tag == 'title':
+            entry['title'] = strip_markup(child.text)
+        elif tag == 'link':
+            # RSS puts the URL in the text, Atom in href (prefer rel="alternate")
+            href = child.get('href')
+            if href is None:
+                entry['link'] = (child.text or '').strip() or entry['link']
+            elif child.get('rel', 'alternate') == 'alternate' or entry['link'] is None:
+                entry['link'] = href.strip()
+        elif tag in ('pubDate', 'published', 'date'):
+            entry['published_at'] = parse_feed_date(child.text)
+        elif tag == 'updated':
+            updated = parse_feed_date(child.text)
+        elif tag in ('description', 'summary') or (tag in ('encoded', 'content') and not entry['summary']):
+            entry['summary'] = strip_markup(child.text)
+
+    entry['published_at'] = entry['published_at'] or updated
+    return entry
+
+
+def iter_feed_entries(content: bytes) -> Iterator[Dict]:
+    """Stream entries out of an RSS 2.0 or Atom document"""
+    parents = []
+    try:
+        for event, elem in ET.iterparse(io.BytesIO(content), events=('start', 'end')):
+            if event == 'start':
+                parents.append(elem)
+                continue
+
+            parents.pop()
+            if local_name(elem.tag) in ('item', 'entry'):
+                entry = entry_fields(elem)
+                # Detach the finished entry so large feeds do not accumulate in memory
+                if parents:
+                    parents[-1].remove(elem)
+                if entry['link']:
+                    yield entry
+    except ET.ParseError as e:
+        logger.error(f"Error parsing feed: {e}")
@@ -0,0 +1,273 @@
+# fetch_engine.py
+import requests
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlparse
+from metrics import CACHE_HITS, DOWNLOADED_BYTES, FETCH_ERRORS, HTTP_RESPONSES, STAGE_SECONDS, MetricsRegistry
+from rate_limiter import HostRateLimiter, parse_retry_after, robots_rate_ceiling
+from session_pool import SessionPool, host_of
+
+logger = logging.getLogger(__name__)
+
+# Responses that mean "slow down" or a transient server failure; retried after the limiter's pause
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class HostGate:
+    def __init__(self, max_concurrency: int = 2, limiter: Optional[HostRateLimiter] = None,
+                 respect_robots: bool = True, label: Optional[str] = None):
+        """
+        Politeness budget for a single host: at most max_concurrency requests
+        in flight, started no faster than the host's adaptive rate limiter allows.
+        `label` names the host in metrics (the source name).
+        """
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.label = label
+        self.limiter = limiter or HostRateLimiter()
+        self.respect_robots = respect_robots
+        self.robots_checked = not respect_robots
+        self.robots_lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+
+    def __enter__(self):
+        self._semaphore.acquire()
+        try:
+            self.limiter.acquire()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._semaphore.release()
+        return False
+
+
+class FetchEngine:
+    def __init__(self, max_workers: int = 16, per_host_concurrency: int = 2,
+                 per_host_delay: float = 1.0, timeout: int = 20,
+                 session_pool: Optional[SessionPool] = None, cache=None, max_retries: int = 3,
+                 metrics: Optional[MetricsRegistry] = None):
+        """
+        Bounded thread-pool fetcher. Many hosts are fetched in parallel while
+        each host is held to its own HostGate budget. `cache` is an optional
+        ResponseCache used by fetch_content for conditional GETs. Throttled
+        or failed requests are retried up to max_retries times once the
+        host's limiter lets them through again. Request latency, status codes
+        and bytes are recorded in `metrics` per host label.
+        """
+        self.session_pool = session_pool or SessionPool()
+        self.metrics = metrics or MetricsRegistry()
+        self.cache = cache
+        self.max_workers = max_workers
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_delay = per_host_delay
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fetch')
+        self._gates: Dict[str, HostGate] = {}
+        self._gates_lock = threading.Lock()
+        # URL -> (ETag, Last-Modified) of listing pages read with keep_body=False, until confirmed
+        self._pending_validators: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self._pending_lock = threading.Lock()
+
+    def configure_host(self, url: str, max_concurrency: Optional[int] = None, delay: Optional[float] = None,
+                       rate_limit: Optional[Dict] = None, label: Optional[str] = None) -> HostGate:
+        """
+        Set the politeness budget for the host of `url`. rate_limit holds
+        HostRateLimiter settings (rate, max_rate, min_rate, burst, respect_robots);
+        delay, when given, seeds the starting rate. label names the host in metrics.
+        """
+        rate_limit = rate_limit or {}
+        gate = HostGate(
+            max_concurrency if max_concurrency is not None else self.per_host_concurrency,
+            HostRateLimiter.from_config(rate_limit, delay if delay is not None else self.per_host_delay),
+            respect_robots=rate_limit.get('respect_robots', True),
+            label=label or host_of(url)
+        )
+        with self._gates_lock:
+            self._gates[host_of(url)] = gate
+        # Keep enough pooled connections for every request the gate lets through,
+        # plus one for a streamed read (sitemap) whose body outlives its gate slot
+        self.session_pool.configure_host(url, pool_maxsize=gate.max_concurrency + 1)
+        return gate
+
+    def gate_for(self, url: str) -> HostGate:
+        """Get (or lazily create) the gate for the host of `url`"""
+        host = host_of(url)
+        with self._gates_lock:
+            gate = self._gates.get(host)
+            if gate is None:
+                gate = HostGate(self.per_host_concurrency, HostRateLimiter.from_config(request_delay=self.per_host_delay),
+                                label=host)
+                self._gates[host] = gate
+            return gate
+
+    def window_for(self, url: str) -> int:
+        """How many fetches to keep in flight for the host of `url`: its gate's concurrency budget"""
+        return self.gate_for(url).max_concurrency
+
+    def check_robots(self, url: str, gate: HostGate):
+        """Cap the host's rate at its robots.txt Crawl-delay / Request-rate (fetched once per host)"""
+        if gate.robots_checked:
+            return
+        with gate.robots_lock:
+            if gate.robots_checked:
+                return
+            parts = urlparse(url)
+            robots_url = f"{parts.scheme}://{parts.netloc}/robots.txt"
+            try:
+                response = self.session_pool.get(robots_url, timeout=self.timeout)
+                if response.status_code == 200:
+                    ceiling = robots_rate_ceiling(response.text)
+                    if ceiling:
+                        gate.limiter.set_ceiling(ceiling)
+                        logger.info(f"{parts.netloc}: robots.txt allows {ceiling:.2f} requests/s")
+            except Exception as e:
+                logger.debug(f"Could not read {robots_url}: {e}")
+            gate.robots_checked = True
+
+    def request(self, url: str, headers: Optional[Dict[str, str]] = None, stream: bool = False,
+                timeout: Optional[float] = None) -> requests.Response:
+        """
+        GET a URL within its host budget, retrying throttled or failed
+        responses once the limiter allows; returns the last response whatever
+        its status. A streamed response only holds its gate slot until the
+        headers arrive, since the caller reads the body at its own pace.
+        """
+        gate = self.gate_for(url)
+        self.check_robots(url, gate)
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                with gate:
+                    # Timed inside the gate: queueing for the host's budget is not request latency
+                    start = time.perf_counter()
+                    response = self.session_pool.get(url, headers=headers, timeout=timeout or self.timeout, stream=stream)
+                    self.metrics.observe(STAGE_SECONDS, time.perf_counter() - start, source=gate.label, stage='fetch')
+            except requests.RequestException:
+                self.metrics.increment(FETCH_ERRORS, source=gate.label)
+                gate.limiter.on_failure()
+                raise
+
+            self.metrics.increment(HTTP_RESPONSES, source=gate.label, status=response.status_code)
+            if not stream:
+                self.metrics.increment(DOWNLOADED_BYTES, len(response.content), source=gate.label)
+            elif response.headers.get('Content-Length', '').isdigit():
+                self.metrics.increment(DOWNLOADED_BYTES, int(response.headers['Content-Length']), source=gate.label)
+            if response.status_code not in RETRY_STATUSES:
+                gate.limiter.on_success()
+                break
+
+            pause = gate.limiter.on_failure(parse_retry_after(response.headers.get('Retry-After')))
+            if attempt < self.max_retries:
+                logger.debug(f"{response.status_code} from {url}, retrying after {pause:.1f}s")
+                response.close()
+
+        return response
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """Fetch a URL within its host budget; raises on HTTP errors"""
+        response = self.request(url, headers=headers)
+        response.raise_for_status()
+        return response
+
+    def fetch_content(self, url: str, headers: Optional[Dict[str, str]] = None,
+                      cache_ttl: Optional[float] = None, keep_body: bool = True) -> bytes:
+        """
+        Fetch a URL body, going through the response cache when cache_ttl is
+        given: fresh entries are served without a request, stale ones are
+        revalidated with If-None-Match / If-Modified-Since and a 304 reuses
+        the cached body. With keep_body=False only the validators are cached
+        and an unchanged page comes back as b'' (nothing new since last read);
+        they are held back until confirm_validators(url), so a page whose
+        links were not all stored is read in full again.
+        """
+        if cache_ttl is None or self.cache is None:
+            return self.fetch(url, headers=headers).content
+
+        entry = self.cache.get(url)
+        # An entry whose body was dropped is only usable by callers that do not need it
+        usable = entry is not None and (entry['content'] is not None or not keep_body)
+        if usable and self.cache.is_fresh(entry, cache_ttl):
+            logger.debug(f"Cache hit (fresh): {url}")
+            self.metrics.increment(CACHE_HITS, source=self.gate_for(url).label)
+            return entry['content'] or b''
+
+        request_headers = dict(headers or {})
+        if usable:
+            request_headers.update(self.cache.conditional_headers(entry))
+
+        response = self.fetch(url, headers=request_headers)
+        if response.status_code == 304 and usable:
+            logger.debug(f"Cache hit (not modified): {url}")
+            self.metrics.increment(CACHE_HITS, source=self.gate_for(url).label)
+            self.cache.touch(url)
+            return entry['content'] or b''
+
+        etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+        if keep_body:
+            self.cache.store(url, response.content, etag=etag, last_modified=last_modified)
+        else:
+            with self._pending_lock:
+                self._pending_validators[url] = (etag, last_modified)
+        return response.content
+
+    def confirm_validators(self, url: str):
+        """Cache the validators of a keep_body=False read once everything it led to is stored"""
+        with self._pending_lock:
+            validators = self._pending_validators.pop(url, None)
+        if validators is not None and self.cache is not None:
+            etag, last_modified = validators
+            self.cache.store(url, None, etag=etag, last_modified=last_modified)
+
+    def discard_validators(self, url: str):
+        """Drop the validators of a read whose links were not all stored"""
+        with self._pending_lock:
+            self._pending_validators.pop(url, None)
+
+    def map(self, func: Callable, items: Iterable, window: Optional[int] = None) -> Iterator:
+        """
+        Run func over items on the shared pool and yield results as they
+        complete. At most `window` calls are in flight so one busy host
+        cannot occupy every worker while it waits on its gate; callers
+        fetching one host pass window_for(url) so its whole budget is used.
+        """
+        window = window or self.per_host_concurrency
+        pending = set()
+        items = iter(items)
+        exhausted = False
+
+        try:
+            while True:
+                while not exhausted and len(pending) < window:
+                    try:
+                        item = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending.add(self.executor.submit(func, item))
+
+                if not pending:
+                    return
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        logger.debug(f"Fetch task failed: {e}")
+        finally:
+            # The caller stopped early: drop the calls that have not started
+            for future in pending:
+                future.cancel()
+
+    def shutdown(self):
+        """Stop the worker pool and close pooled connections"""
+        self.executor.shutdown(wait=True)
+        self.session_pool.close()
+        if self.cache is not None:
+            self.cache.close()
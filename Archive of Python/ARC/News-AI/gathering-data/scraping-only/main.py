@@ -1,33 +1,48 @@
 # main.py
-from news_scraper import NewsScraper
-from db.data_organizer import NewsDataOrganizer
+from news_scraper import DB_DIR, NewsScraper
+from db.data_organizer import (DEFAULT_DATA_DIR, OUTPUT_FORMATS, NewsDataOrganizer, organization_statistics,
+                               scan_organization_statistics)
+from db.article_store import ArticleStore, open_read_only
+from db.export_manifest import read_manifest_counts
+from profiling import PhaseProfiler
+from daemon import DEFAULT_CYCLE_BUDGET, DEFAULT_POLL_INTERVAL, CollectorDaemon, exclusive
+import argparse
 import logging
 import os
+from datetime import datetime
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def main():
+@exclusive
+def main(profile: bool = False, output_format: str = 'txt'):
     """
     Main function to run the complete news data collection and organization system
+    
+    Args:
+        profile (bool): Write cProfile/tracemalloc reports per step to db/profiles
+        output_format (str): Organizer layout, 'txt' files or daily 'jsonl' shards
     """
+    profiler = PhaseProfiler("main", enabled=profile)
     print("=" * 70)
     print("NEWS DATA COLLECTION AND ORGANIZATION SYSTEM")
     print("=" * 70)
     print()
     
+    scraper = None
     try:
         # Step 1: Initialize and run news scraper
         print("Step 1: Collecting news data...")
         print("-" * 40)
         
-        # Initialize news scraper
-        scraper = NewsScraper()
+        # Initialize news scraper (parsing in-process when profiling, so the profile includes it)
+        scraper = NewsScraper(parse_workers=0 if profile else None)
         
         # Run collection (collects data from last run to now)
         # For first run, this will attempt to collect last 10 years of data
-        collection_result = scraper.run_collection(initial_collection_days=365*10)
+        with profiler.phase("collection"):
+            collection_result = scraper.run_collection(initial_collection_days=365*10)
         
         print(f"\nCollection Results:")
         print(f"  New articles collected: {collection_result['new_articles']}")
@@ -40,10 +55,11 @@ def main():
         print("-" * 40)
         
         # Initialize data organizer
-        organizer = NewsDataOrganizer()
+        organizer = NewsDataOrganizer(output_format=output_format)
         
         # Organize all collected data
-        organization_stats = organizer.organize_all_data()
+        with profiler.phase("organization"):
+            organization_stats = organizer.organize_all_data()
         
         print(f"\nOrganization Results:")
         total_organized = sum(organization_stats.values())
@@ -92,24 +108,34 @@ def main():
         logger.error(f"Error in main process: {e}")
         print(f"\n❌ Error occurred: {e}")
         return None
+    finally:
+        if scraper is not None:
+            scraper.close()
 
-def quick_collection(days: int = 30):
+@exclusive
+def quick_collection(days: int = 30, profile: bool = False, output_format: str = 'txt'):
     """
     Quick collection function for recent data only
     
     Args:
         days (int): Number of days to collect (default: 30)
+        profile (bool): Write cProfile/tracemalloc reports per step to db/profiles
+        output_format (str): Organizer layout, 'txt' files or daily 'jsonl' shards
     """
+    profiler = PhaseProfiler("quick", enabled=profile)
     print(f"Quick Collection: Last {days} days")
     print("=" * 50)
     
+    scraper = None
     try:
         # Quick collection and organization
-        scraper = NewsScraper()
-        collection_result = scraper.run_collection(initial_collection_days=days)
+        scraper = NewsScraper(parse_workers=0 if profile else None)
+        with profiler.phase("collection"):
+            collection_result = scraper.run_collection(initial_collection_days=days)
         
-        organizer = NewsDataOrganizer()
-        organization_stats = organizer.organize_recent_data(days=days)
+        organizer = NewsDataOrganizer(output_format=output_format)
+        with profiler.phase("organization"):
+            organization_stats = organizer.organize_recent_data(days=days)
         
         print(f"\nQuick Collection Results:")
         print(f"  New articles: {collection_result['new_articles']}")
@@ -120,20 +146,31 @@ def quick_collection(days: int = 30):
     except Exception as e:
         logger.error(f"Error in quick collection: {e}")
         return None, None
+    finally:
+        if scraper is not None:
+            scraper.close()
 
-def collect_10_years_data():
+@exclusive
+def collect_10_years_data(profile: bool = False, output_format: str = 'txt'):
     """
     Special function to attempt collection of 10 years of data
+    
+    Args:
+        profile (bool): Write cProfile/tracemalloc reports per step to db/profiles
+        output_format (str): Organizer layout, 'txt' files or daily 'jsonl' shards
     """
+    profiler = PhaseProfiler("10years", enabled=profile)
     print("10-Year Data Collection")
     print("=" * 30)
     
+    scraper = None
     try:
-        scraper = NewsScraper()
+        scraper = NewsScraper(parse_workers=0 if profile else None)
         print("Attempting to collect 10 years of historical data...")
         print("This may take a while and depends on website availability...")
         
-        collection_result = scraper.run_collection(initial_collection_days=365*10)
+        with profiler.phase("collection"):
+            collection_result = scraper.run_collection(initial_collection_days=365*10)
         
         print(f"\n10-Year Collection Results:")
         print(f"  New articles collected: {collection_result['new_articles']}")
@@ -141,8 +178,9 @@ def collect_10_years_data():
         
         # Organize the data
         print("\nOrganizing collected data...")
-        organizer = NewsDataOrganizer()
-        organization_stats = organizer.organize_all_data()
+        organizer = NewsDataOrganizer(output_format=output_format)
+        with profiler.phase("organization"):
+            organization_stats = organizer.organize_all_data()
         
         print(f"  Articles organized: {sum(organization_stats.values())}")
         
@@ -151,6 +189,9 @@ def collect_10_years_data():
     except Exception as e:
         logger.error(f"Error in 10-year collection: {e}")
         return None, None
+    finally:
+        if scraper is not None:
+            scraper.close()
 
 def show_current_status():
     """Show current system status without collecting new data"""
@@ -158,52 +199,196 @@ def show_current_status():
     print("=" * 30)
     
     try:
-        # Show database info
-        scraper = NewsScraper()
-        if os.path.exists(scraper.db_path):
-            db_size = os.path.getsize(scraper.db_path)
+        # Read-only queries only: opening the scraper or organizer would set up
+        # the schema, build indexes and create the data directory
+        db_path = os.path.join(DB_DIR, "news_data.db")
+        counts = []
+        if os.path.exists(db_path):
+            db_size = os.path.getsize(db_path)
             db_size_mb = db_size / (1024 * 1024)
-            print(f"Database: {scraper.db_path}")
+            print(f"Database: {db_path}")
             print(f"Size: {db_size_mb:.2f} MB")
+            
+            conn = open_read_only(db_path)
+            try:
+                stored = conn.execute('SELECT COUNT(*) FROM news_articles').fetchone()[0]
+                print(f"Stored articles: {stored}")
+                counts = read_manifest_counts(conn, DEFAULT_DATA_DIR)
+            finally:
+                conn.close()
         else:
             print("Database: Not found")
         
-        # Show organized data info
-        organizer = NewsDataOrganizer()
-        stats = organizer.get_organization_statistics()
+        # Show organized data info (a tree from before the export manifest is counted on disk)
+        stats = organization_statistics(counts) if counts else scan_organization_statistics(DEFAULT_DATA_DIR)
         print(f"Organized articles: {stats['total_articles']}")
         print(f"Sources: {stats['total_sources']}")
         
         # Show folder structure
-        if os.path.exists(organizer.base_data_dir):
-            print(f"Data directory: {os.path.abspath(organizer.base_data_dir)}")
+        if os.path.exists(DEFAULT_DATA_DIR):
+            print(f"Data directory: {os.path.abspath(DEFAULT_DATA_DIR)}")
         else:
             print("Data directory: Not created yet")
             
     except Exception as e:
         logger.error(f"Error showing status: {e}")
 
+def index_duplicates():
+    """Fingerprint articles stored before near-duplicate detection existed"""
+    print("Near-Duplicate Indexing")
+    print("=" * 30)
+    
+    try:
+        store = ArticleStore()
+        duplicates = store.near_duplicates.index_existing()
+        total = store.query_one('SELECT COUNT(*) FROM news_articles WHERE canonical_id IS NOT NULL')[0]
+        store.close()
+        
+        print(f"  Duplicates found: {duplicates}")
+        print(f"  Total articles linked to a canonical copy: {total}")
+        return duplicates
+        
+    except Exception as e:
+        logger.error(f"Error indexing duplicates: {e}")
+        return None
+
+def compress_database():
+    """One-time migration of plain-text article bodies to compressed storage"""
+    print("Article Compression")
+    print("=" * 30)
+    
+    try:
+        store = ArticleStore()
+        size_before = os.path.getsize(store.db_path)
+        migrated = store.content_codec.migrate()
+        print(f"  Articles compressed: {migrated}")
+        
+        print("  Compacting database file...")
+        store.compact()
+        size_after = os.path.getsize(store.db_path)
+        store.close()
+        
+        print(f"  Size: {size_before / (1024 * 1024):.2f} MB -> {size_after / (1024 * 1024):.2f} MB")
+        return migrated
+        
+    except Exception as e:
+        logger.error(f"Error compressing database: {e}")
+        return None
+
+def search_articles(args):
+    """Full-text search over collected articles"""
+    parser = argparse.ArgumentParser(prog="main.py search", description="Search collected news articles")
+    parser.add_argument("query", help='FTS5 query, e.g. "climate AND summit" or a plain phrase')
+    parser.add_argument("--source", help="Only articles from this source")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Only articles published on or after YYYY-MM-DD")
+    parser.add_argument("--page", type=int, default=1, help="Result page (default 1)")
+    parser.add_argument("--limit", type=int, default=20, help="Results per page (default 20)")
+    parser.add_argument("--include-duplicates", action="store_true", help="Also show near-duplicate copies")
+    options = parser.parse_args(args)
+    
+    try:
+        store = ArticleStore()
+        results = store.search_index.search(
+            options.query,
+            source=options.source,
+            since=options.since,
+            page=options.page,
+            per_page=options.limit,
+            include_duplicates=options.include_duplicates
+        )
+        store.close()
+        
+        print(f"Results for {options.query!r} (page {options.page})")
+        print("=" * 70)
+        if not results:
+            print("No matching articles")
+        for number, article in enumerate(results, start=(options.page - 1) * options.limit + 1):
+            print(f"{number}. {article['title']}")
+            print(f"   {article['source']} | {article['published_at']}")
+            print(f"   {article['url']}")
+        
+        return results
+        
+    except Exception as e:
+        logger.error(f"Error searching articles: {e}")
+        return None
+
+def run_daemon(args, output_format: str = 'txt'):
+    """Keep collecting on a per-source schedule until stopped with Ctrl-C or SIGTERM"""
+    parser = argparse.ArgumentParser(prog="main.py daemon", description="Run the news collector continuously")
+    parser.add_argument("--interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                        help=f"Seconds between collections of a source without its own poll_interval (default {DEFAULT_POLL_INTERVAL})")
+    parser.add_argument("--budget", type=float, default=DEFAULT_CYCLE_BUDGET,
+                        help=f"Seconds of backfill per cycle before other sources get their turn (default {DEFAULT_CYCLE_BUDGET})")
+    parser.add_argument("--initial-days", type=int, default=365*10, help="History to collect for a new source (default 10 years)")
+    parser.add_argument("--no-organize", action="store_true", help="Do not export new articles to the folder structure")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this port")
+    options = parser.parse_args(args)
+    
+    daemon = CollectorDaemon(
+        poll_interval=options.interval,
+        cycle_budget=options.budget,
+        initial_collection_days=options.initial_days,
+        organize=not options.no_organize,
+        metrics_port=options.metrics_port,
+        output_format=output_format
+    )
+    return daemon.run()
+
 if __name__ == "__main__":
     import sys
     
+    # --profile applies to the collection commands (full run, quick, 10years)
+    profile = "--profile" in sys.argv
+    if profile:
+        sys.argv.remove("--profile")
+    
+    # --format txt|jsonl picks the organizer's output layout for the commands that export
+    output_format = 'txt'
+    if "--format" in sys.argv:
+        index = sys.argv.index("--format")
+        output_format = sys.argv[index + 1] if index + 1 < len(sys.argv) else ''
+        del sys.argv[index:index + 2]
+        if output_format not in OUTPUT_FORMATS:
+            print(f"--format must be one of: {', '.join(OUTPUT_FORMATS)}")
+            sys.exit(2)
+    
     # Check command line arguments
     if len(sys.argv) > 1:
         if sys.argv[1] == "quick":
             # Quick collection with optional days parameter
             days = int(sys.argv[2]) if len(sys.argv) > 2 else 30
-            quick_collection(days)
+            quick_collection(days, profile=profile, output_format=output_format)
         elif sys.argv[1] == "10years":
             # Attempt 10-year collection
-            collect_10_years_data()
+            collect_10_years_data(profile=profile, output_format=output_format)
         elif sys.argv[1] == "status":
             # Show current status
             show_current_status()
+        elif sys.argv[1] == "dedup":
+            # Fingerprint existing articles for near-duplicate detection
+            index_duplicates()
+        elif sys.argv[1] == "search":
+            # Full-text search: search "<query>" [--source NAME] [--since YYYY-MM-DD] [--page N]
+            search_articles(sys.argv[2:])
+        elif sys.argv[1] == "compress-db":
+            # Compress article bodies stored by earlier versions
+            compress_database()
+        elif sys.argv[1] == "daemon":
+            # Long-running collector: daemon [--interval SECONDS] [--metrics-port N]
+            run_daemon(sys.argv[2:], output_format=output_format)
         else:
             print("Usage:")
             print("  python main.py           # Full collection and organization")
             print("  python main.py quick [days]  # Quick collection (default 30 days)")
             print("  python main.py 10years       # Attempt 10-year collection")
+            print("  python main.py [quick [days] | 10years] --profile  # Also write per-step profiles to db/profiles")
             print("  python main.py status        # Show current status")
+            print("  python main.py dedup         # Link near-duplicate articles already stored")
+            print('  python main.py search "<query>" [--source NAME] [--since YYYY-MM-DD] [--page N]')
+            print("  python main.py compress-db   # Compress article bodies stored as plain text")
+            print("  python main.py daemon [--interval SECONDS] [--metrics-port N]  # Collect continuously")
+            print("  python main.py [quick [days] | 10years | daemon] --format jsonl  # Export daily gzipped JSON-lines shards")
     else:
         # Run full process
-        main()
+        main(profile=profile, output_format=output_format)
@@ -0,0 +1,243 @@
+# metrics.py
+import os
+import copy
+import time
+import threading
+import logging
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Metric names; every one carries a `source` label
+STAGE_SECONDS = 'news_stage_duration_seconds'
+HTTP_RESPONSES = 'news_http_responses_total'
+DOWNLOADED_BYTES = 'news_downloaded_bytes_total'
+FETCH_ERRORS = 'news_fetch_errors_total'
+CACHE_HITS = 'news_cache_hits_total'
+PARSE_FAILURES = 'news_parse_failures_total'
+ROWS_STORED = 'news_rows_stored_total'
+
+METRIC_HELP = {
+    STAGE_SECONDS: ('histogram', 'Seconds per fetch request, article parse or store batch, by stage'),
+    HTTP_RESPONSES: ('counter', 'HTTP responses received, by status code'),
+    DOWNLOADED_BYTES: ('counter', 'Response body bytes downloaded'),
+    FETCH_ERRORS: ('counter', 'Requests that failed without a response (connection errors, timeouts)'),
+    CACHE_HITS: ('counter', 'Pages served from the response cache'),
+    PARSE_FAILURES: ('counter', 'Article pages that could not be parsed or yielded no text'),
+    ROWS_STORED: ('counter', 'New article rows written to the database'),
+}
+
+# Upper bounds (seconds) of the histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+def label_set(labels: Dict) -> LabelSet:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def format_labels(labels: LabelSet) -> str:
+    if not labels:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+
+def format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsRegistry:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        In-process counters and latency histograms, labelled per source and
+        stage. Exported in the Prometheus text format, either as a file for
+        node_exporter's textfile collector or from a small /metrics endpoint.
+        """
+        self.buckets = tuple(sorted(buckets))
+        # (name, labels) -> value
+        self._counters: Dict[Tuple[str, LabelSet], float] = {}
+        # (name, labels) -> [per-bucket counts (last one is +Inf), sum, count]
+        self._histograms: Dict[Tuple[str, LabelSet], list] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def increment(self, name: str, amount: float = 1, **labels):
+        key = (name, label_set(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, label_set(labels))
+        index = len(self.buckets)
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = position
+                break
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._histograms[key] = histogram
+            histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    @contextmanager
+    def time(self, name: str, **labels):
+        """Observe how long the with-block took"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> Dict:
+        """Copy of the current values, to report only what happened after it"""
+        with self._lock:
+            return {'counters': dict(self._counters), 'histograms': copy.deepcopy(self._histograms)}
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+            histograms = [(key, [list(value[0]), value[1], value[2]]) for key, value in histograms]
+
+        lines = []
+        described = set()
+
+        def describe(name: str):
+            if name not in described:
+                metric_type, help_text = METRIC_HELP.get(name, ('untyped', name))
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                described.add(name)
+
+        for (name, labels), value in counters:
+            describe(name)
+            lines.append(f'{name}{format_labels(labels)} {format_value(value)}')
+
+        for (name, labels), (counts, total, count) in histograms:
+            describe(name)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else format_value(bound)
+                lines.append(f'{name}_bucket{format_labels(labels + (("le", le),))} {cumulative}')
+            lines.append(f'{name}_sum{format_labels(labels)} {format_value(total)}')
+            lines.append(f'{name}_count{format_labels(labels)} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path: str):
+        """Write the metrics for the textfile collector (atomically, so it never reads half a file)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+
+    def serve(self, port: int, host: str = '') -> ThreadingHTTPServer:
+        """Expose /metrics over HTTP from a background thread"""
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True).start()
+        logger.info(f"Serving metrics on http://{host or '0.0.0.0'}:{self._server.server_address[1]}/metrics")
+        return self._server
+
+    def stop(self):
+        """Shut down the /metrics endpoint if it was started"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def quantile(self, counts: List[int], q: float) -> Optional[float]:
+        """Estimate a quantile from bucket counts, interpolating inside the bucket like histogram_quantile()"""
+        total = sum(counts)
+        if not total:
+            return None
+        rank = q * total
+        cumulative = 0
+        lower = 0.0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                if bound == float('inf'):
+                    return lower
+                return lower + (bound - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+            if bound != float('inf'):
+                lower = bound
+        return lower
+
+    def source_summary(self, since: Optional[Dict] = None) -> List[Dict]:
+        """Per-source totals (optionally only since a snapshot()), for the end-of-run table"""
+        current = self.snapshot()
+        before = since or {'counters': {}, 'histograms': {}}
+        rows: Dict[str, Dict] = {}
+
+        def row(labels: LabelSet) -> Dict:
+            source_name = dict(labels).get('source', 'unknown')
+            return rows.setdefault(source_name, {
+                'source': source_name, 'requests': 0, 'errors': 0, 'bytes': 0, 'cache_hits': 0,
+                'parse_failures': 0, 'stored': 0, 'stages': {}
+            })
+
+        for (name, labels), value in current['counters'].items():
+            value -= before['counters'].get((name, labels), 0)
+            if not value:
+                continue
+            entry = row(labels)
+            if name == HTTP_RESPONSES:
+                entry['requests'] += value
+                if int(dict(labels).get('status', 0)) >= 400:
+                    entry['errors'] += value
+            elif name == FETCH_ERRORS:
+                entry['requests'] += value
+                entry['errors'] += value
+            elif name == DOWNLOADED_BYTES:
+                entry['bytes'] += value
+            elif name == CACHE_HITS:
+                entry['cache_hits'] += value
+            elif name == PARSE_FAILURES:
+                entry['parse_failures'] += value
+            elif name == ROWS_STORED:
+                entry['stored'] += value
+
+        for (name, labels), (counts, total, count) in current['histograms'].items():
+            previous = before['histograms'].get((name, labels))
+            if previous:
+                counts = [now - then for now, then in zip(counts, previous[0])]
+                total, count = total - previous[1], count - previous[2]
+            if name != STAGE_SECONDS or not count:
+                continue
+            row(labels)['stages'][dict(labels).get('stage', 'unknown')] = {
+                'count': count,
+                'seconds': total,
+                'p50': self.quantile(counts, 0.5),
+                'p95': self.quantile(counts, 0.95)
+            }
+
+        return sorted(rows.values(), key=lambda entry: entry['source'])
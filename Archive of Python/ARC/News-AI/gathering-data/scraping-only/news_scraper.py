@@ -1,13 +1,24 @@
 # news_scraper.py (updated collection methods)
-import requests
-import sqlite3
 import time
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Dict, Optional, Iterator, Tuple
 from bs4 import BeautifulSoup
 import logging
 import random
 import os
+import threading
+import weakref
+from fetch_engine import FetchEngine
+from session_pool import SessionPool
+from db.response_cache import ResponseCache
+from db.article_store import ArticleStore, ArticleBatchWriter
+from db.backfill_state import BackfillTracker
+from db.collection_watermarks import ARCHIVE, LIVE, CollectionWatermarks
+from db.compression import derive_description
+from extraction import DEFAULT_PARSER, get_extractor, extract_article_data
+from metrics import MetricsRegistry, PARSE_FAILURES, ROWS_STORED, STAGE_SECONDS
+from pipeline import CollectionPipeline
+from feeds import iter_feed_entries
 
 # Set up logging
 DB_DIR = "db"
@@ -24,15 +35,46 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Seconds a cached listing page is served without revalidation (0 = always send a conditional GET)
+DEFAULT_CACHE_TTL = 0
+# Archive pages for past dates rarely change, so they are trusted for longer
+DEFAULT_ARCHIVE_CACHE_TTL = 30 * 24 * 3600
+# During a backfill each source's front page is collected again once this many seconds have passed
+DEFAULT_LIVE_INTERVAL = 300
+# Fields returned by the article read APIs unless a projection is given
+ARTICLE_FIELDS = ['title', 'description', 'content', 'url', 'source', 'published_at', 'collected_at', 'collection_method']
+
 class NewsScraper:
-    def __init__(self, db_path: str = os.path.join(DB_DIR, "news_data.db")):
+    def __init__(self, db_path: str = os.path.join(DB_DIR, "news_data.db"), max_workers: int = 16,
+                 parse_workers: Optional[int] = None, cache_path: Optional[str] = None,
+                 metrics_path: Optional[str] = os.path.join(DB_DIR, "metrics.prom"),
+                 metrics_port: Optional[int] = None):
         """
-        News scraper with multiple collection strategies and detailed logging
+        News scraper with multiple collection strategies and detailed logging.
+        Per-source metrics are written to metrics_path (Prometheus text format)
+        after each run and, if metrics_port is given, served on /metrics.
         """
         self.db_path = db_path
+        self.parse_workers = parse_workers
+        self.pipeline = None
+        # Source name -> time.monotonic() of its last live (front page) collection
+        self.live_collected_at: Dict[str, float] = {}
+        # Front pages read in the current pipeline run (read_at, page URL, article URLs found, all links taken);
+        # their watermarks and validators are committed once those articles are stored
+        self.live_reads: Dict[str, Tuple[datetime, str, List[str], bool]] = {}
+        self.live_reads_lock = threading.Lock()
+        # Batch writers of the pipeline runs in progress, for flush_writers
+        self.writers = weakref.WeakSet()
+        self.metrics = MetricsRegistry()
+        self.metrics_path = metrics_path
+        if metrics_port is not None:
+            self.metrics.serve(metrics_port)
         self.setup_database()
         self.last_collection_time = self.get_last_collection_time()
         
+        # URLs already in the database; candidates found here are never fetched again
+        self.known_urls = self.load_known_urls()
+        
         # Load news sources from external file
         try:
             from news_sources import NEWS_SOURCES
@@ -48,6 +90,29 @@ class NewsScraper:
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         ]
+        
+        # Keep-alive sessions shared by every component that talks to the sources
+        self.session_pool = SessionPool()
+        
+        # Parallel fetch engine with a politeness budget per host
+        self.fetch_engine = FetchEngine(
+            max_workers=max_workers,
+            session_pool=self.session_pool,
+            cache=ResponseCache(cache_path or os.path.join(DB_DIR, "http_cache.db")),
+            metrics=self.metrics
+        )
+        for source in self.news_sources:
+            self.fetch_engine.configure_host(
+                source['base_url'],
+                max_concurrency=source.get('max_concurrency'),
+                delay=source.get('request_delay'),
+                rate_limit=source.get('rate_limit'),
+                label=source['name']
+            )
+        
+        # Compile every source's selectors once up front
+        for source in self.news_sources:
+            get_extractor(source)
     
     def get_default_sources(self) -> List[Dict]:
         """Default news sources with archive support"""
@@ -81,43 +146,16 @@ class NewsScraper:
         ]
     
     def setup_database(self):
-        """Create database table for news articles"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS news_articles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                content TEXT,
-                url TEXT UNIQUE,
-                source TEXT,
-                published_at TIMESTAMP,
-                collected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                collection_method TEXT
-            )
-        ''')
-        
-        # Create indexes for faster queries
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_collected_at ON news_articles(collected_at)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_published_at ON news_articles(published_at)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_source ON news_articles(source)')
-        
-        conn.commit()
-        conn.close()
+        """Open the long-lived article store (creates tables on first use)"""
+        self.store = ArticleStore(self.db_path)
+        self.backfill = BackfillTracker(self.store)
+        self.watermarks = CollectionWatermarks(self.store)
         logger.info("Database setup completed")
         logger.info(f"Database location: {self.db_path}")
     
     def get_last_collection_time(self) -> Optional[datetime]:
         """Get the timestamp of the last collection"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT MAX(collected_at) FROM news_articles')
-        result = cursor.fetchone()[0]
-        
-        conn.close()
+        result = self.store.query_one('SELECT MAX(collected_at) FROM news_articles')[0]
         
         if result:
             try:
@@ -126,20 +164,98 @@ class NewsScraper:
                 return None
         return None
     
-    def get_collection_window(self, initial_collection_days: int = 365*10) -> tuple:
-        """Get the time window for data collection"""
+    def load_known_urls(self) -> set:
+        """Load every stored article URL into an in-memory set"""
+        rows = self.store.query('SELECT url FROM news_articles WHERE url IS NOT NULL')
+        known_urls = {row[0] for row in rows}
+        
+        logger.info(f"Loaded {len(known_urls)} known article URLs")
+        return known_urls
+    
+    def remember_urls(self, articles: List[Dict]):
+        """Keep the known URL index in step with the table"""
+        self.known_urls.update(article.get('url') for article in articles if article.get('url'))
+    
+    def get_source_windows(self, initial_collection_days: int = 365*10,
+                           sources: Optional[List[Dict]] = None) -> Dict[str, Tuple[datetime, datetime]]:
+        """
+        Time window to collect for each source: from its own watermark (or its
+        oldest unfinished backfill day) to now. A source seen for the first
+        time gets the initial period.
+        """
+        now = datetime.now()
+        windows = {}
+        
+        for source in (sources if sources is not None else self.news_sources):
+            source_name = source['name']
+            from_time = self.watermarks.collected_until(source_name)
+            if from_time is None:
+                from_time = now - timedelta(days=initial_collection_days)
+            
+            # Unfinished backfill days lie behind the watermark
+            earliest_open = self.backfill.earliest_open_day(source_name)
+            if earliest_open and datetime.combine(earliest_open, datetime.min.time()) < from_time:
+                from_time = datetime.combine(earliest_open, datetime.min.time())
+            
+            windows[source_name] = (from_time, now)
+        
+        return windows
+    
+    def get_collection_window(self, initial_collection_days: int = 365*10, sources: Optional[List[Dict]] = None) -> tuple:
+        """Get the time window for data collection (the union of every source's window)"""
         now = datetime.now()
+        windows = self.get_source_windows(initial_collection_days, sources)
         
         # If this is first run or no previous data, collect default period
-        if not self.last_collection_time:
+        if not self.watermarks.all():
             from_time = now - timedelta(days=initial_collection_days)
             logger.info(f"First collection - will collect last {initial_collection_days} days of data")
         else:
-            from_time = self.last_collection_time
+            from_time = min((start for start, _ in windows.values()), default=now)
+            newest = max((start for start, _ in windows.values()), default=now)
+            for source_name, (start, _) in windows.items():
+                if start < newest:
+                    logger.info(f"{source_name} is behind: collecting from {start}")
+            
             logger.info(f"Collecting data from {from_time} to {now}")
         
         return from_time, now
     
+    def supports_archive(self, source_config: Dict) -> bool:
+        return bool(source_config.get('supports_archive', False) and source_config.get('archive_url_pattern'))
+    
+    def note_live_read(self, source_name: str, read_at: datetime, page_url: str, article_urls: List[str],
+                       complete: bool = True):
+        """
+        A source's front page (or feed) was read successfully at read_at,
+        listing article_urls; complete=False if max_articles left links unread
+        """
+        with self.live_reads_lock:
+            previous = self.live_reads.get(source_name)
+            if previous is not None:
+                article_urls = previous[2] + article_urls
+                complete = complete and previous[3]
+            self.live_reads[source_name] = (read_at, page_url, article_urls, complete)
+    
+    def commit_live_watermarks(self):
+        """
+        Advance the LIVE watermark and cache the page validators of every
+        source whose front page was read and whose articles are all stored.
+        A page with articles still missing, or left unread because of
+        max_articles, is read in full again next time.
+        """
+        with self.live_reads_lock:
+            reads, self.live_reads = self.live_reads, {}
+        for source_name, (read_at, page_url, article_urls, complete) in reads.items():
+            missing = [url for url in article_urls if url not in self.known_urls]
+            if missing or not complete:
+                if missing:
+                    logger.info(f"○ {len(missing)} articles from {source_name} front page not stored, reading it in full next time")
+                self.fetch_engine.discard_validators(page_url)
+                continue
+            self.watermarks.advance(source_name, LIVE, read_at)
+            self.fetch_engine.confirm_validators(page_url)
+    
     def get_random_headers(self) -> Dict[str, str]:
         """Get random headers to avoid blocking"""
         return {
@@ -151,142 +267,189 @@ class NewsScraper:
             'Referer': 'https://www.google.com/',
         }
     
-    def scrape_page(self, url: str) -> Optional[BeautifulSoup]:
-        """Scrape a webpage and return BeautifulSoup object"""
+    def fetch_html(self, url: str, cache_ttl: Optional[float] = None, keep_body: bool = True) -> Optional[bytes]:
+        """
+        Download a page body (cached when cache_ttl is given). With keep_body=False
+        only the page's validators are cached and an unchanged page returns b''.
+        """
         try:
             headers = self.get_random_headers()
-            response = requests.get(url, headers=headers, timeout=20)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            return soup
+            return self.fetch_engine.fetch_content(url, headers=headers, cache_ttl=cache_ttl, keep_body=keep_body)
             
         except Exception as e:
             logger.error(f"Error scraping {url}: {e}")
             return None
     
-    def scrape_current_news(self, source_config: Dict) -> List[Dict]:
-        """Scrape current news from main pages"""
-        articles = []
+    def scrape_page(self, url: str, cache_ttl: Optional[float] = None) -> Optional[BeautifulSoup]:
+        """Scrape a webpage and return BeautifulSoup object (cached when cache_ttl is given)"""
+        content = self.fetch_html(url, cache_ttl=cache_ttl)
+        if content is None:
+            return None
+        return BeautifulSoup(content, DEFAULT_PARSER)
+    
+    def find_feed_articles(self, source_config: Dict) -> Optional[List[Tuple[str, Dict]]]:
+        """
+        New articles from a source's RSS/Atom feed (None if it could not be read).
+        Unless 'feed_full_content' is set, each job already carries the complete
+        record built from the feed and no article page is fetched.
+        """
+        source_name = source_config.get('name', 'Unknown')
+        logger.info(f"Reading feed for {source_name}...")
+        
+        read_at = datetime.now()
+        # Entries of a feed read before are already stored, so an unchanged feed needs no cached copy
+        content = self.fetch_html(source_config['feed_url'], cache_ttl=source_config.get('cache_ttl', DEFAULT_CACHE_TTL),
+                                  keep_body=False)
+        if content is None:
+            logger.warning(f"Failed to read {source_name} feed")
+            return None
+        if not content:
+            logger.info(f"○ {source_name} feed unchanged since last read")
+            self.note_live_read(source_name, read_at, source_config['feed_url'], [])
+            return []
+        
+        full_content = source_config.get('feed_full_content', False)
+        max_articles = source_config.get('max_articles', 15)
+        jobs = []
+        
+        for entry in iter_feed_entries(content):
+            if len(jobs) >= max_articles:
+                break
+            if entry['link'] in self.known_urls:
+                continue
+            
+            fields = {'collection_method': 'feed'}
+            if entry['published_at']:
+                fields['published_at'] = entry['published_at']
+            
+            if not full_content:
+                summary = entry['summary'] or ''
+                fields.update({
+                    'title': entry['title'] or "No title",
+                    'description': derive_description(summary),
+                    'content': summary
+                })
+            jobs.append((entry['link'], fields))
+        
+        self.note_live_read(source_name, read_at, source_config['feed_url'], [url for url, _ in jobs],
+                            complete=len(jobs) < max_articles)
+        logger.info(f"Found {len(jobs)} new feed entries from {source_name}")
+        return jobs
+    
+    def find_current_articles(self, source_config: Dict) -> Optional[List[Tuple[str, Dict]]]:
+        """
+        New article URLs on a source's front page (or feed), with the fields to
+        stamp on each (None if the page could not be read)
+        """
+        if source_config.get('feed_url'):
+            return self.find_feed_articles(source_config)
+        
         source_name = source_config.get('name', 'Unknown')
         logger.info(f"Scraping current news from {source_name}...")
         
-        soup = self.scrape_page(source_config['url'])
-        if not soup:
+        read_at = datetime.now()
+        # Same for the front page: only its validators are cached
+        html = self.fetch_html(source_config['url'], cache_ttl=source_config.get('cache_ttl', DEFAULT_CACHE_TTL),
+                               keep_body=False)
+        if html is None:
             logger.warning(f"Failed to scrape {source_name} main page")
-            return articles
+            return None
+        if not html:
+            logger.info(f"○ {source_name} front page unchanged since last read")
+            self.note_live_read(source_name, read_at, source_config['url'], [])
+            return []
         
+        max_articles = source_config.get('max_articles', 15)
         try:
-            # Find article links based on selectors
-            link_selector = source_config['selectors'].get('article_links', 'a')
-            article_links = soup.select(link_selector)
-            
-            logger.info(f"Found {len(article_links)} potential article links from {source_name}")
-            
-            processed_urls = []
-            max_articles = source_config.get('max_articles', 15)
-            
-            for link in article_links[:max_articles]:
-                try:
-                    href = link.get('href')
-                    if not href:
-                        continue
-                    
-                    # Make absolute URL
-                    if href.startswith('/'):
-                        full_url = urljoin(source_config['base_url'], href)
-                    else:
-                        full_url = href
-                    
-                    # Validate URL
-                    if source_config['base_url'] in full_url and full_url not in processed_urls:
-                        article_data = self.scrape_article(full_url, source_config)
-                        if article_data:
-                            article_data['collection_method'] = 'current'
-                            articles.append(article_data)
-                            processed_urls.append(full_url)
-                    
-                    # Be respectful - add delay
-                    time.sleep(1)
-                    
-                except Exception as e:
-                    logger.debug(f"Error processing link from {source_name}: {e}")
-                    continue
-            
+            article_urls = self.extract_article_urls(html, source_config, max_articles)
         except Exception as e:
             logger.error(f"Error scraping source {source_name}: {e}")
+            return None
         
-        logger.info(f"✓ Successfully scraped {len(articles)} articles from {source_name}")
-        return articles
+        self.note_live_read(source_name, read_at, source_config['url'], article_urls,
+                           complete=len(article_urls) < max_articles)
+        return [(url, {'collection_method': 'current'}) for url in article_urls]
     
-    def scrape_historical_archive(self, source_config: Dict, target_date: datetime) -> List[Dict]:
-        """Scrape historical news from archive pages"""
+    def current_jobs(self, source_config: Dict) -> List[Tuple[str, Dict]]:
+        """find_current_articles as a pipeline job factory (no jobs if the page could not be read)"""
+        return self.find_current_articles(source_config) or []
+    
+    def archive_url(self, source_config: Dict, target_date: date) -> Optional[str]:
+        """A source's archive page URL for one day"""
+        try:
+            return source_config['archive_url_pattern'].format(
+                year=target_date.year,
+                month=target_date.month,
+                day=target_date.day
+            )
+        except KeyError:
+            return None
+    
+    def release_archive_page(self, source_config: Dict, day: date):
+        """A finished backfill day's archive page is not read again: drop it from the response cache"""
+        archive_url = self.archive_url(source_config, day)
+        if archive_url and self.fetch_engine.cache is not None:
+            self.fetch_engine.cache.forget(archive_url)
+    
+    def find_archive_articles(self, source_config: Dict, target_date: datetime) -> Optional[List[Tuple[str, Dict]]]:
+        """New article URLs on a source's archive page for one day (None if the page could not be fetched)"""
         if not source_config.get('supports_archive', False):
             logger.debug(f"{source_config['name']} does not support archive scraping")
             return []
         
-        articles = []
         source_name = source_config.get('name', 'Unknown')
         
         # Generate archive URL
-        try:
-            archive_url = source_config['archive_url_pattern'].format(
-                year=target_date.year,
-                month=target_date.month,
-                day=target_date.day
-            )
-        except KeyError:
+        archive_url = self.archive_url(source_config, target_date)
+        if archive_url is None:
             logger.warning(f"No archive URL pattern for {source_name}")
-            return articles
+            return []
         
         logger.info(f"Scraping archive for {source_name} - {target_date.strftime('%Y-%m-%d')}")
         
-        soup = self.scrape_page(archive_url)
-        if not soup:
+        html = self.fetch_html(
+            archive_url,
+            cache_ttl=source_config.get('archive_cache_ttl', DEFAULT_ARCHIVE_CACHE_TTL)
+        )
+        if not html:
             logger.debug(f"No archive data found for {source_name} on {target_date.strftime('%Y-%m-%d')}")
-            return articles
+            return None
         
         try:
-            # Find article links in archive
-            link_selector = source_config['selectors'].get('article_links', 'a')
-            article_links = soup.select(link_selector)
-            
-            logger.info(f"Found {len(article_links)} potential historical articles from {source_name}")
-            
-            processed_urls = []
-            max_articles = source_config.get('max_articles', 10)
-            
-            for link in article_links[:max_articles]:
-                try:
-                    href = link.get('href')
-                    if not href:
-                        continue
-                    
-                    # Make absolute URL
-                    if href.startswith('/'):
-                        full_url = urljoin(source_config['base_url'], href)
-                    else:
-                        full_url = href
-                    
-                    # Validate URL
-                    if source_config['base_url'] in full_url and full_url not in processed_urls:
-                        article_data = self.scrape_article(full_url, source_config)
-                        if article_data:
-                            # Set the historical date
-                            article_data['published_at'] = target_date.isoformat()
-                            article_data['collection_method'] = 'archive'
-                            articles.append(article_data)
-                            processed_urls.append(full_url)
-                    
-                    # Be respectful - add delay
-                    time.sleep(1.5)
-                    
-                except Exception as e:
-                    logger.debug(f"Error processing archive link from {source_name}: {e}")
-                    continue
-            
+            article_urls = self.extract_article_urls(html, source_config, source_config.get('max_articles', 10))
         except Exception as e:
             logger.error(f"Error scraping archive for {source_name}: {e}")
+            return []
+        
+        # Set the historical date
+        fields = {'published_at': target_date.isoformat(), 'collection_method': 'archive'}
+        return [(url, fields) for url in article_urls]
+    
+    def scrape_jobs(self, source_config: Dict, jobs: List[Tuple[str, Dict]]) -> List[Dict]:
+        """Fetch and parse article jobs inline, in parallel within the host's budget"""
+        def scrape(job):
+            url, fields = job
+            if 'content' in fields:
+                # Complete record from a feed - nothing to fetch
+                return dict(fields, url=url, source=source_config.get('name', 'Unknown'))
+            article_data = self.scrape_article(url, source_config)
+            if article_data:
+                article_data.update(fields)
+            return article_data
+        
+        window = self.fetch_engine.window_for(source_config['base_url'])
+        return [article_data for article_data in self.fetch_engine.map(scrape, jobs, window=window) if article_data]
+    
+    def scrape_current_news(self, source_config: Dict) -> List[Dict]:
+        """Scrape current news from main pages"""
+        articles = self.scrape_jobs(source_config, self.current_jobs(source_config))
+        logger.info(f"✓ Successfully scraped {len(articles)} articles from {source_config.get('name', 'Unknown')}")
+        return articles
+    
+    def scrape_historical_archive(self, source_config: Dict, target_date: datetime) -> List[Dict]:
+        """Scrape historical news from archive pages"""
+        source_name = source_config.get('name', 'Unknown')
+        articles = self.scrape_jobs(source_config, self.find_archive_articles(source_config, target_date) or [])
         
         if articles:
             logger.info(f"✓ Successfully scraped {len(articles)} historical articles from {source_name}")
@@ -295,142 +458,213 @@ class NewsScraper:
         
         return articles
     
-    def scrape_article(self, url: str, source_config: Dict) -> Optional[Dict]:
-        """Scrape individual article from any source"""
-        soup = self.scrape_page(url)
-        if not soup:
-            return None
+    def extract_article_urls(self, html: bytes, source_config: Dict, max_articles: int) -> List[str]:
+        """Collect unique absolute article URLs from a listing page"""
+        source_name = source_config.get('name', 'Unknown')
+        hrefs = get_extractor(source_config).extract_links(html)
         
-        try:
-            # Extract title
-            title_selector = source_config['selectors'].get('title', 'h1')
-            title_elem = soup.select_one(title_selector)
-            title = title_elem.get_text().strip() if title_elem else "No title"
-            
-            # Extract content
-            content = ""
-            content_selectors = source_config['selectors'].get('content', [])
-            if isinstance(content_selectors, str):
-                content_selectors = [content_selectors]
-            
-            # Try multiple content selectors
-            for selector in content_selectors:
-                content_elements = soup.select(selector)
-                if content_elements:
-                    content = ' '.join([elem.get_text().strip() for elem in content_elements])
-                    break
-            
-            # Fallback to paragraphs if no specific content selector works
-            if not content:
-                paragraphs = soup.find_all('p')
-                content = ' '.join([p.get_text().strip() for p in paragraphs[:20]])
+        logger.info(f"Found {len(hrefs)} potential article links from {source_name}")
+        
+        article_urls = []
+        seen = set()
+        skipped = 0
+        for href in hrefs:
+            if len(article_urls) >= max_articles:
+                break
             
-            # Extract description (first part of content)
-            description = content[:300] + "..." if len(content) > 300 else content
+            # Make absolute URL
+            if href.startswith('/'):
+                full_url = urljoin(source_config['base_url'], href)
+            else:
+                full_url = href
             
-            return {
-                'title': title,
-                'description': description,
-                'content': content,
-                'url': url,
-                'source': source_config.get('name', 'Unknown'),
-                'published_at': datetime.now().isoformat()
-            }
+            # Validate URL
+            if source_config['base_url'] not in full_url or full_url in seen:
+                continue
+            seen.add(full_url)
             
-        except Exception as e:
-            logger.error(f"Error scraping article {url}: {e}")
+            # Already stored - no need to download it again
+            if full_url in self.known_urls:
+                skipped += 1
+                continue
+            article_urls.append(full_url)
+        
+        if skipped:
+            logger.info(f"Skipped {skipped} already stored articles from {source_name}")
+        
+        return article_urls
+    
+    def scrape_article(self, url: str, source_config: Dict) -> Optional[Dict]:
+        """Scrape individual article from any source"""
+        html = self.fetch_html(url)
+        if not html:
             return None
+        
+        source_name = source_config.get('name', 'Unknown')
+        with self.metrics.time(STAGE_SECONDS, source=source_name, stage='parse'):
+            article_data = extract_article_data(url, html, source_config)
+        if not article_data or not article_data.get('content'):
+            self.metrics.increment(PARSE_FAILURES, source=source_name)
+        return article_data
     
     def store_articles(self, articles: List[Dict]) -> int:
         """Store articles in database"""
         if not articles:
             return 0
-            
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         
-        stored_count = 0
+        start = time.perf_counter()
+        try:
+            stored_count = self.store.insert_articles(articles)
+        except Exception as e:
+            logger.error(f"Error storing {len(articles)} articles: {e}")
+            return 0
+        self.record_write(articles[0].get('source', 'Unknown'), stored_count, time.perf_counter() - start)
+        self.remember_urls(articles)
+        return stored_count
+    
+    def record_write(self, source_name: str, count: int, seconds: float):
+        """Store-stage metrics for one insert"""
+        self.metrics.observe(STAGE_SECONDS, seconds, source=source_name, stage='store')
+        self.metrics.increment(ROWS_STORED, count, source=source_name)
+    
+    def create_writer(self) -> ArticleBatchWriter:
+        """Batch writer for bulk collection runs"""
+        writer = ArticleBatchWriter(self.store, on_write=self.record_write, on_stored=self.remember_urls)
+        self.writers.add(writer)
+        return writer
+    
+    def flush_writers(self) -> int:
+        """Write the rows buffered by every open batch writer, e.g. before a forced exit"""
+        return sum(writer.flush() for writer in list(self.writers))
+    
+    def iter_backfill_jobs(self, source: Dict, days: List[date], started: List[Tuple[str, date]]) -> Iterator[Tuple[str, Dict]]:
+        """Yield article jobs for a source's open backfill days, recording each unit's progress"""
+        source_name = source['name']
         
-        for article in articles:
+        for day in days:
+            self.backfill.mark_running(source_name, day)
             try:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO news_articles 
-                    (title, description, content, url, source, published_at, collection_method)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    article.get('title', ''),
-                    article.get('description', ''),
-                    article.get('content', ''),
-                    article.get('url', ''),
-                    article.get('source', 'Unknown'),
-                    article.get('published_at'),
-                    article.get('collection_method', 'unknown')
-                ))
-                
-                if cursor.rowcount > 0:
-                    stored_count += 1
-                    
+                jobs = self.find_archive_articles(source, datetime.combine(day, datetime.min.time()))
             except Exception as e:
-                logger.error(f"Error storing article from {article.get('source', 'Unknown')}: {e}")
-        
-        conn.commit()
-        conn.close()
-        
-        return stored_count
+                logger.error(f"Error collecting from {source_name} for {day}: {e}")
+                jobs = None
+            
+            if jobs is None:
+                self.backfill.mark_failed(source_name, day, "archive page unavailable")
+                continue
+            
+            started.append((source_name, day))
+            yield from jobs
+    
+    def iter_live_jobs(self, source: Dict) -> Iterator[Tuple[str, Dict]]:
+        """Front-page jobs for a source, if its live slot is due (it stays due until a read succeeds)"""
+        collected_at = self.live_collected_at.get(source['name'])
+        if collected_at is not None and time.monotonic() - collected_at < source.get('live_interval', DEFAULT_LIVE_INTERVAL):
+            return
+        jobs = self.find_current_articles(source)
+        if jobs is None:
+            return
+        self.live_collected_at[source['name']] = time.monotonic()
+        yield from jobs
+    
+    def iter_scheduled_jobs(self, source: Dict, days: List[date], started: List[Tuple[str, date]]) -> Iterator[Tuple[str, Dict]]:
+        """
+        Recency-first job stream for one source: live front-page jobs first,
+        then backfill days newest to oldest, with the live slot coming round
+        again between days whenever its interval has passed
+        """
+        yield from self.iter_live_jobs(source)
+        for day in days:
+            yield from self.iter_backfill_jobs(source, [day], started)
+            yield from self.iter_live_jobs(source)
     
-    def collect_historical_data(self, from_date: datetime, to_date: datetime) -> Dict[str, int]:
-        """Collect historical data by date range with detailed source tracking"""
+    def get_pipeline(self) -> CollectionPipeline:
+        """Fetch/parse/store pipeline, started on first use"""
+        if self.pipeline is None:
+            self.pipeline = CollectionPipeline(self, parse_workers=self.parse_workers)
+        return self.pipeline
+    
+    def run_pipeline(self, sources: List[Dict], job_factory) -> Dict[str, int]:
+        """Run the pipeline, then advance the live watermarks of the front pages it stored"""
+        try:
+            return self.get_pipeline().run(sources, job_factory)
+        finally:
+            self.commit_live_watermarks()
+    
+    def collect_historical_data(self, from_date: datetime, to_date: datetime, chunk_days: int = 7,
+                                source_starts: Optional[Dict[str, datetime]] = None,
+                                sources: Optional[List[Dict]] = None,
+                                keep_going: Optional[Callable[[], bool]] = None) -> Dict[str, int]:
+        """
+        Collect historical data by date range with detailed source tracking.
+        Recency first: today's front pages go before any archive work, the
+        archives are walked newest to oldest, and the front pages are
+        collected again every live_interval while the backfill runs.
+        source_starts limits the archive work to those sources, each from
+        its own start (default: every source from from_date). keep_going is
+        checked before each chunk; when it returns False the remaining days
+        stay queued for the next run.
+        """
+        sources = sources if sources is not None else self.news_sources
         logger.info(f"Starting historical data collection: {from_date.date()} to {to_date.date()}")
         logger.info(f"Total days to process: {(to_date - from_date).days + 1}")
         
-        source_stats = {source['name']: 0 for source in self.news_sources}
-        total_articles = 0
-        current_date = from_date
-        
-        # Collect data day by day for better organization
-        day_count = 0
-        total_days = (to_date - from_date).days + 1
-        
-        while current_date <= to_date:
-            day_count += 1
-            progress_percent = (day_count / total_days) * 100
-            logger.info(f"Processing date: {current_date.strftime('%Y-%m-%d')} ({progress_percent:.1f}% complete)")
-            
-            daily_stats = {}
+        source_stats = {source['name']: 0 for source in sources}
+        sources_by_name = {source['name']: source for source in sources}
+        today = datetime.now().date()
+        backfill_end = min(to_date.date(), today - timedelta(days=1))
+        live = to_date.date() >= today
+        if live:
+            # Every source's live slot is due at the start of a run
+            self.live_collected_at.clear()
+        
+        # Past days are tracked as (source, day) work units so a crash resumes exactly
+        if source_starts is None:
+            source_starts = {source['name']: from_date for source in sources}
+        for source_name, start in source_starts.items():
+            self.backfill.seed([source_name], max(start, from_date), datetime.combine(backfill_end, datetime.min.time()))
+        
+        chunk_end = backfill_end
+        while chunk_end >= from_date.date():
+            if keep_going is not None and not keep_going():
+                logger.info(f"Pausing backfill before {chunk_end}; the remaining days stay queued")
+                break
+            chunk_start = max(chunk_end - timedelta(days=chunk_days - 1), from_date.date())
+            window = (datetime.combine(chunk_start, datetime.min.time()), datetime.combine(chunk_end, datetime.min.time()))
+            open_days = {source['name']: self.backfill.open_days(source['name'], *window, newest_first=True)
+                         for source in sources}
             
-            # For each source, try archive scraping first, then current scraping
-            for source in self.news_sources:
-                source_name = source['name']
-                try:
-                    # Try archive scraping for historical dates
-                    if current_date.date() < datetime.now().date():
-                        articles = self.scrape_historical_archive(source, current_date)
-                    else:
-                        # For today, use current news scraping
-                        articles = self.scrape_current_news(source)
-                    
-                    stored_count = self.store_articles(articles)
-                    source_stats[source_name] += stored_count
-                    daily_stats[source_name] = stored_count
-                    total_articles += stored_count
-                    
-                    # Be extra respectful between sources and dates
-                    time.sleep(3)
-                    
-                except Exception as e:
-                    logger.error(f"Error collecting from {source_name}: {e}")
-            
-            # Log daily summary
-            daily_total = sum(daily_stats.values())
-            if daily_total > 0:
-                logger.info(f"  Daily summary for {current_date.strftime('%Y-%m-%d')}: {daily_total} articles")
-                for source_name, count in daily_stats.items():
-                    if count > 0:
-                        logger.info(f"    {source_name}: {count} articles")
-            else:
-                logger.info(f"  No articles found for {current_date.strftime('%Y-%m-%d')}")
+            if any(open_days.values()):
+                progress_percent = ((backfill_end - chunk_start).days + 1) / ((backfill_end - from_date.date()).days + 1) * 100
+                logger.info(f"Processing {chunk_end} back to {chunk_start} ({progress_percent:.1f}% complete)")
+                
+                # Every source walks its own archive in parallel; hosts are throttled by the fetch engine
+                started = []
+                if live:
+                    job_factory = lambda source: self.iter_scheduled_jobs(source, open_days[source['name']], started)
+                else:
+                    job_factory = lambda source: self.iter_backfill_jobs(source, open_days[source['name']], started)
+                chunk_stats = self.run_pipeline(sources, job_factory)
+                
+                # Units are only marked done once the pipeline has written their articles
+                for source_name, day in started:
+                    self.backfill.mark_done(source_name, day, self.backfill.count_archived(source_name, day))
+                    self.watermarks.advance(source_name, ARCHIVE, datetime.combine(day + timedelta(days=1), datetime.min.time()))
+                    self.release_archive_page(sources_by_name[source_name], day)
+                for source_name, count in chunk_stats.items():
+                    source_stats[source_name] += count
             
-            current_date += timedelta(days=1)
+            chunk_end = chunk_start - timedelta(days=1)
+        
+        # Sources whose live slot never came round (no archive work left, or every read failed) still get today's news
+        if live:
+            remaining = [source for source in sources if source['name'] not in self.live_collected_at]
+            if remaining:
+                for source_name, count in self.run_pipeline(remaining, self.current_jobs).items():
+                    source_stats[source_name] += count
+        
+        total_articles = sum(source_stats.values())
+        logger.info(f"Backfill progress: {self.backfill.progress()}")
         
         logger.info("=" * 60)
         logger.info("HISTORICAL COLLECTION SUMMARY")
@@ -443,33 +677,36 @@ class NewsScraper:
         
         return source_stats
     
-    def collect_data_since_last_collection(self, initial_collection_days: int = 365*10) -> Dict[str, int]:
-        """Collect data from last collection time to current time with source tracking"""
-        from_time, to_time = self.get_collection_window(initial_collection_days)
+    def collect_data_since_last_collection(self, initial_collection_days: int = 365*10,
+                                           sources: Optional[List[Dict]] = None,
+                                           keep_going: Optional[Callable[[], bool]] = None) -> Dict[str, int]:
+        """Collect every source (or the given ones) from its own watermark to the current time"""
+        sources = sources if sources is not None else self.news_sources
+        windows = self.get_source_windows(initial_collection_days, sources)
+        to_time = datetime.now()
+        today_start = datetime.combine(to_time.date(), datetime.min.time())
+        
+        # Past days are off the front page: sources with archives fill their own gaps from them
+        gaps = {
+            source['name']: windows[source['name']][0] for source in sources
+            if windows[source['name']][0] < today_start and self.supports_archive(source)
+        }
         
-        # For large time ranges, collect in chunks
-        if (to_time - from_time).days > 30:  # More than 30 days
-            logger.info("Large time range detected, using chunked collection...")
-            return self.collect_historical_data(from_time, to_time)
+        if gaps:
+            for source_name, start in gaps.items():
+                logger.info(f"{source_name}: collecting archives from {start.date()}")
+            logger.info("Past days to collect, using chunked collection...")
+            return self.collect_historical_data(min(gaps.values()), to_time, source_starts=gaps,
+                                                sources=sources, keep_going=keep_going)
         else:
-            # Standard collection for smaller ranges
+            # Standard collection when every gap is within today's front pages
             logger.info("Starting standard data collection...")
             
-            source_stats = {source['name']: 0 for source in self.news_sources}
-            total_articles = 0
-            
-            # Scrape all configured sources for current news
-            for source in self.news_sources:
-                source_name = source['name']
-                try:
-                    articles = self.scrape_current_news(source)
-                    stored_count = self.store_articles(articles)
-                    source_stats[source_name] = stored_count
-                    total_articles += stored_count
-                    logger.info(f"✓ {source_name}: {stored_count} articles")
-                    time.sleep(2)  # Be extra respectful between sources
-                except Exception as e:
-                    logger.error(f"Error collecting from {source_name}: {e}")
+            # Scrape all configured sources for current news in parallel
+            source_stats = self.run_pipeline(sources, self.current_jobs)
+            for source_name, count in source_stats.items():
+                logger.info(f"✓ {source_name}: {count} articles")
+            total_articles = sum(source_stats.values())
             
             logger.info("=" * 50)
             logger.info("STANDARD COLLECTION SUMMARY")
@@ -482,103 +719,73 @@ class NewsScraper:
             
             return source_stats
     
-    def get_articles_since_last_collection(self) -> List[Dict]:
-        """Get articles collected since last collection"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        if self.last_collection_time:
-            cursor.execute('''
-                SELECT title, description, content, url, source, published_at, collected_at, collection_method
-                FROM news_articles 
-                WHERE collected_at >= ?
-                ORDER BY collected_at DESC
-            ''', (self.last_collection_time.isoformat(),))
-        else:
-            # If no last collection time, get last 10 years
-            since_time = datetime.now() - timedelta(days=365*10)
-            cursor.execute('''
-                SELECT title, description, content, url, source, published_at, collected_at, collection_method
-                FROM news_articles 
-                WHERE collected_at >= ?
-                ORDER BY collected_at DESC
-            ''', (since_time.isoformat(),))
-        
-        articles = []
-        for row in cursor.fetchall():
-            articles.append({
-                'title': row[0],
-                'description': row[1],
-                'content': row[2],
-                'url': row[3],
-                'source': row[4],
-                'published_at': row[5],
-                'collected_at': row[6],
-                'collection_method': row[7]
-            })
-        
-        conn.close()
-        return articles
+    def get_articles_since_last_collection(self, columns: Optional[List[str]] = None,
+                                           batch_size: int = 1000) -> Iterator[Dict]:
+        """Stream articles collected since last collection, newest first"""
+        # If no last collection time, get last 10 years
+        since_time = self.last_collection_time or datetime.now() - timedelta(days=365*10)
+        return self.store.iter_articles(
+            columns or ARTICLE_FIELDS,
+            since=since_time,
+            order_by='collected_at',
+            batch_size=batch_size
+        )
     
-    def get_all_articles(self, limit: int = 10000) -> List[Dict]:
-        """Get all articles from database (with limit)"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT title, description, content, url, source, published_at, collected_at, collection_method
-            FROM news_articles 
-            ORDER BY published_at DESC
-            LIMIT ?
-        ''', (limit,))
-        
-        articles = []
-        for row in cursor.fetchall():
-            articles.append({
-                'title': row[0],
-                'description': row[1],
-                'content': row[2],
-                'url': row[3],
-                'source': row[4],
-                'published_at': row[5],
-                'collected_at': row[6],
-                'collection_method': row[7]
-            })
-        
-        conn.close()
-        return articles
+    def get_all_articles(self, limit: Optional[int] = 10000, columns: Optional[List[str]] = None,
+                         batch_size: int = 1000) -> Iterator[Dict]:
+        """Stream articles from database by publish date (with limit)"""
+        return self.store.iter_articles(
+            columns or ARTICLE_FIELDS,
+            order_by='published_at',
+            batch_size=batch_size,
+            limit=limit
+        )
     
-    def run_collection(self, initial_collection_days: int = 365*10):
-        """Run data collection with enhanced historical support and detailed logging"""
+    def run_collection(self, initial_collection_days: int = 365*10, sources: Optional[List[Dict]] = None,
+                       keep_going: Optional[Callable[[], bool]] = None):
+        """
+        Run data collection with enhanced historical support and detailed logging.
+        sources restricts the run to some sources; keep_going can pause a long backfill.
+        """
         logger.info("=" * 70)
         logger.info("NEWS DATA COLLECTION STARTED")
         logger.info("=" * 70)
+        metrics_before = self.metrics.snapshot()
         
         # Show collection window
-        from_time, to_time = self.get_collection_window(initial_collection_days)
+        from_time, to_time = self.get_collection_window(initial_collection_days, sources)
         logger.info(f"Collection window: {from_time} to {to_time}")
         logger.info(f"Days to collect: {(to_time - from_time).days}")
         
         # Collect data
-        source_stats = self.collect_data_since_last_collection(initial_collection_days)
+        source_stats = self.collect_data_since_last_collection(initial_collection_days, sources, keep_going)
         
-        # Get articles from this session
-        recent_articles = self.get_articles_since_last_collection()
+        # Count articles from this session without loading them
+        since_time = self.last_collection_time or datetime.now() - timedelta(days=365*10)
+        new_articles = self.store.count_articles(since=since_time)
         
         logger.info("=" * 70)
         logger.info("FINAL COLLECTION SUMMARY")
         logger.info("=" * 70)
-        logger.info(f"New articles collected: {len(recent_articles)}")
+        logger.info(f"New articles collected: {new_articles}")
         logger.info("Collection breakdown by source:")
         for source_name, count in source_stats.items():
-            percentage = (count / len(recent_articles) * 100) if len(recent_articles) > 0 else 0
+            percentage = (count / new_articles * 100) if new_articles > 0 else 0
             logger.info(f"  {source_name}: {count} articles ({percentage:.1f}%)")
         logger.info("=" * 70)
         
-        return {
-            'new_articles': len(recent_articles),
-            'total_available': len(recent_articles),
-            'articles': recent_articles,
+        self.log_metrics_summary(metrics_before)
+        if self.metrics_path:
+            try:
+                self.metrics.write_textfile(self.metrics_path)
+            except Exception as e:
+                logger.error(f"Error writing metrics to {self.metrics_path}: {e}")
+        
+        result = {
+            'new_articles': new_articles,
+            'total_available': new_articles,
+            # Lazy: iterate to stream the session's articles
+            'articles': self.get_articles_since_last_collection(),
             'source_breakdown': source_stats,
             'collection_period': {
                 'from': from_time.isoformat(),
@@ -586,6 +793,40 @@ class NewsScraper:
                 'days': (to_time - from_time).days
             }
         }
+        
+        # A long-lived scraper counts the next run's articles from here
+        self.last_collection_time = self.get_last_collection_time() or self.last_collection_time
+        return result
+
+    def log_metrics_summary(self, since: Optional[Dict] = None):
+        """Per-source table of requests, errors, bytes, stage latency and rows stored"""
+        def milliseconds(stage: Dict, key: str) -> str:
+            value = stage.get(key) if stage else None
+            return f"{value * 1000:.0f}" if value is not None else "-"
+        
+        logger.info("SOURCE METRICS")
+        logger.info(f"  {'Source':<18} {'Requests':>8} {'Errors':>7} {'MB':>8} {'Fetch p50/p95 ms':>17} "
+                    f"{'Parse p95 ms':>12} {'Parse fails':>11} {'Store p95 ms':>12} {'Stored':>7}")
+        for row in self.metrics.source_summary(since):
+            fetch = row['stages'].get('fetch')
+            parse = row['stages'].get('parse')
+            store = row['stages'].get('store')
+            error_rate = f"{row['errors'] / row['requests'] * 100:.1f}%" if row['requests'] else "-"
+            logger.info(f"  {row['source'][:18]:<18} {int(row['requests']):>8} {error_rate:>7} "
+                        f"{row['bytes'] / (1024 * 1024):>8.2f} "
+                        f"{milliseconds(fetch, 'p50') + '/' + milliseconds(fetch, 'p95'):>17} "
+                        f"{milliseconds(parse, 'p95'):>12} {int(row['parse_failures']):>11} "
+                        f"{milliseconds(store, 'p95'):>12} {int(row['stored']):>7}")
+        logger.info("=" * 70)
+    
+    def close(self):
+        """Stop worker pools and close connections"""
+        if self.pipeline is not None:
+            self.pipeline.close()
+            self.pipeline = None
+        self.fetch_engine.shutdown()
+        self.metrics.stop()
+        self.store.close()
 
 # Utility functions
 def urljoin(base: str, url: str) -> str:
@@ -11,7 +11,9 @@ NEWS_SOURCES = [
             'title': 'h1',
             'content': ['div[data-component="text-block"]', 'article']
         },
-        'max_articles': 15
+        'max_articles': 15,
+        'feed_url': 'https://feeds.bbci.co.uk/news/world/rss.xml',
+        'feed_full_content': True
     },
     
     # Reuters
@@ -50,7 +52,9 @@ NEWS_SOURCES = [
             'title': 'h1',
             'content': ['.wysiwyg', '.article-content']
         },
-        'max_articles': 10
+        'max_articles': 10,
+        'feed_url': 'https://www.aljazeera.com/xml/rss/all.xml',
+        'feed_full_content': True
     },
     
     # The Guardian
@@ -63,7 +67,9 @@ NEWS_SOURCES = [
             'title': 'h1',
             'content': ['.article-body-commercial-selector', 'article']
         },
-        'max_articles': 10
+        'max_articles': 10,
+        'feed_url': 'https://www.theguardian.com/world/rss',
+        'feed_full_content': True
     },
     
     # Financial Times
@@ -117,6 +123,22 @@ NEWS_SOURCES = [
         'title': 'h1',                           # CSS selector for article title
         'content': ['.article-content', 'article']  # List of CSS selectors for content (in order of preference)
     },
-    'max_articles': 10  # Maximum number of articles to scrape per collection
+    'max_articles': 10,  # Maximum number of articles to scrape per collection
+    'live_interval': 300,  # Optional: seconds between front-page collections while a backfill runs
+    'poll_interval': 900,  # Optional: seconds between collections of this source in daemon mode
+    'max_concurrency': 2,  # Optional: parallel requests allowed to this host
+    'request_delay': 1.0,  # Optional: starting seconds between requests (the rate then adapts)
+    'rate_limit': {  # Optional: adaptive per-host token bucket (requests per second)
+        'rate': 1.0,  # starting rate (overrides request_delay)
+        'max_rate': 8.0,  # ceiling reached while the host answers normally (robots.txt may lower it)
+        'min_rate': 0.05,  # floor after repeated 429/503/errors
+        'burst': 2,  # requests allowed back to back
+        'respect_robots': True  # cap max_rate at robots.txt Crawl-delay / Request-rate
+    },
+    'cache_ttl': 0,  # Optional: seconds a cached listing page is reused without revalidation
+    'archive_cache_ttl': 2592000,  # Optional: same for archive pages (default 30 days)
+    'parser': 'lxml',  # Optional: BeautifulSoup backend (defaults to lxml when installed)
+    'feed_url': 'https://www.example.com/rss.xml',  # Optional: RSS/Atom feed used instead of the front page
+    'feed_full_content': False  # Optional: also fetch each article page for the full text
 }
 """
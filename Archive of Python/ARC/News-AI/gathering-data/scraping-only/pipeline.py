@@ -0,0 +1,226 @@
+# pipeline.py
+import os
+import queue
+import signal
+import threading
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from extraction import extract_article_data
+from metrics import PARSE_FAILURES, STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# A job is an article URL plus the fields to stamp on the extracted record.
+# Jobs whose fields already carry 'content' (e.g. from a feed) are complete
+# records and skip the fetch and parse stages.
+Job = Tuple[str, Dict]
+
+_DONE = object()
+# Seconds a fetch thread waits on a full queue before checking whether the run was stopped
+PUT_TIMEOUT = 0.5
+
+
+def ignore_interrupts():
+    """Parse worker initializer: Ctrl-C reaches the whole process group, but only the parent decides when to stop"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def timed_extract(url: str, html: bytes, source: Dict) -> Tuple[Optional[Dict], float]:
+    """extract_article_data plus the seconds it took, measured in the worker"""
+    start = time.perf_counter()
+    article_data = extract_article_data(url, html, source)
+    return article_data, time.perf_counter() - start
+
+
+class CollectionPipeline:
+    def __init__(self, scraper, parse_workers: Optional[int] = None, queue_size: int = 256):
+        """
+        Three-stage collection pipeline:
+          fetch  - one thread per source pulls raw bytes through the fetch engine
+          parse  - a process pool runs extract_article_data on every core
+                   (parse_workers=0 parses in this process, e.g. to profile it)
+          store  - a single writer thread batches records into the article store
+        Stages are joined by bounded queues, so a slow stage backs up the ones
+        feeding it instead of buffering without limit. If the parse stage fails
+        or is interrupted (Ctrl-C), the fetch threads are told to stop and the
+        run returns without waiting for them to finish the chunk.
+        """
+        self.scraper = scraper
+        self.parse_workers = parse_workers if parse_workers is not None else os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.parse_pool = None
+        if self.parse_workers > 0:
+            # spawn keeps the workers clear of the fetch threads' locks in the parent
+            self.parse_pool = ProcessPoolExecutor(
+                max_workers=self.parse_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=ignore_interrupts
+            )
+
+    def run(self, sources: List[Dict], job_factory: Callable[[Dict], Iterable[Job]]) -> Dict[str, int]:
+        """Collect job_factory(source) for every source; returns stored counts per source"""
+        raw_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        record_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        writer = self.scraper.create_writer()
+
+        store_thread = threading.Thread(target=self.store_stage, args=(record_queue, writer), name='pipeline-store')
+        store_thread.start()
+
+        fetch_pool = ThreadPoolExecutor(max_workers=max(1, len(sources)), thread_name_prefix='pipeline-fetch')
+        fetchers = [fetch_pool.submit(self.fetch_stage, source, job_factory, raw_queue, stop) for source in sources]
+        closer = threading.Thread(target=self.close_when_done, args=(fetchers, raw_queue, stop),
+                                  name='pipeline-close', daemon=True)
+        closer.start()
+
+        completed = False
+        try:
+            self.parse_stage(raw_queue, record_queue)
+            completed = True
+        finally:
+            if not completed:
+                # Fetchers stop at their next job and stop waiting on the full queue;
+                # requests already in flight are left to finish on their own
+                stop.set()
+                self.drain(raw_queue)
+            # Records already parsed are still written
+            record_queue.put(_DONE)
+            if completed:
+                closer.join()
+            fetch_pool.shutdown(wait=completed, cancel_futures=True)
+            store_thread.join()
+
+        return {source['name']: writer.stored_by_source.get(source['name'], 0) for source in sources}
+
+    def fetch_stage(self, source: Dict, job_factory: Callable[[Dict], Iterable[Job]], raw_queue: queue.Queue,
+                    stop: threading.Event):
+        """Download every job of one source and hand the bytes to the parse stage, until stop is set"""
+        source_name = source.get('name', 'Unknown')
+
+        def fetch(job: Job):
+            url, fields = job
+            return url, fields, self.scraper.fetch_html(url)
+
+        def fetchable(jobs: Iterable[Job]) -> Iterable[Job]:
+            for url, fields in jobs:
+                if stop.is_set():
+                    return
+                if 'content' in fields:
+                    self.put(raw_queue, (url, source, fields, None), stop)
+                else:
+                    yield url, fields
+
+        fetch_engine = self.scraper.fetch_engine
+        results = fetch_engine.map(fetch, fetchable(job_factory(source)), window=fetch_engine.window_for(source['base_url']))
+        try:
+            for url, fields, html in results:
+                if stop.is_set():
+                    break
+                if html:
+                    self.put(raw_queue, (url, source, fields, html), stop)
+        except Exception as e:
+            logger.error(f"Error fetching articles from {source_name}: {e}")
+        finally:
+            # Cancels the fetches not started yet
+            results.close()
+
+    def put(self, raw_queue: queue.Queue, item, stop: threading.Event) -> bool:
+        """Queue an item for the parse stage; gives up (False) once the run is stopped"""
+        while not stop.is_set():
+            try:
+                raw_queue.put(item, timeout=PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def drain(self, raw_queue: queue.Queue):
+        """Discard pages nobody will parse"""
+        try:
+            while True:
+                raw_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def close_when_done(self, fetchers: List, raw_queue: queue.Queue, stop: threading.Event):
+        wait(fetchers)
+        self.put(raw_queue, _DONE, stop)
+
+    def parse_stage(self, raw_queue: queue.Queue, record_queue: queue.Queue):
+        """Feed raw pages to the process pool, at most two per worker in flight"""
+        max_in_flight = self.parse_workers * 2
+        pending = {}
+        metrics = self.scraper.metrics
+
+        def emit(article_data, fields):
+            if article_data:
+                article_data.update(fields)
+                record_queue.put(article_data)
+
+        def parsed(source_name, article_data, seconds, fields):
+            metrics.observe(STAGE_SECONDS, seconds, source=source_name, stage='parse')
+            if not article_data or not article_data.get('content'):
+                metrics.increment(PARSE_FAILURES, source=source_name)
+            emit(article_data, fields)
+
+        def drain(futures):
+            for future in futures:
+                source_name, fields = pending.pop(future)
+                try:
+                    parsed(source_name, *future.result(), fields)
+                except Exception as e:
+                    metrics.increment(PARSE_FAILURES, source=source_name)
+                    logger.error(f"Error parsing article: {e}")
+
+        while True:
+            item = raw_queue.get()
+            if item is _DONE:
+                break
+
+            if len(pending) >= max_in_flight:
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                drain(done)
+
+            url, source, fields, html = item
+            source_name = source.get('name', 'Unknown')
+            if html is None:
+                emit({'url': url, 'source': source_name}, fields)
+                continue
+            if self.parse_pool is None:
+                parsed(source_name, *timed_extract(url, html, source), fields)
+                continue
+
+            try:
+                pending[self.parse_pool.submit(timed_extract, url, html, source)] = (source_name, fields)
+            except BrokenProcessPool as e:
+                # Keep the run going on this process rather than dropping pages
+                logger.error(f"Parse pool unavailable, parsing in-process: {e}")
+                parsed(source_name, *timed_extract(url, html, source), fields)
+
+        drain(list(pending))
+
+    def store_stage(self, record_queue: queue.Queue, writer):
+        """Batch extracted records into the article store"""
+        try:
+            while True:
+                article_data = record_queue.get()
+                if article_data is _DONE:
+                    break
+                try:
+                    # The writer adds the URL to the known set once the batch is committed
+                    writer.add(article_data)
+                except Exception as e:
+                    logger.error(f"Error queueing article {article_data.get('url')}: {e}")
+        finally:
+            writer.close()
+            if writer.failed:
+                logger.warning(f"{len(writer.failed)} articles could not be stored and will be fetched again next run")
+
+    def close(self):
+        """Shut down the parse workers"""
+        if self.parse_pool is not None:
+            self.parse_pool.shutdown(wait=True)
@@ -0,0 +1,128 @@
+# profiling.py
+import os
+import csv
+import cProfile
+import pstats
+import threading
+import tracemalloc
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_DIR = os.path.join("db", "profiles")
+# Stack depth kept per allocation; deeper is slower but attributes allocations better
+TRACEBACK_FRAMES = 10
+
+
+class PhaseProfiler:
+    def __init__(self, run_name: str, output_dir: str = DEFAULT_PROFILE_DIR, top_n: int = 40, enabled: bool = True):
+        """
+        cProfile and tracemalloc per phase of a run (collection, organization...).
+        Every phase writes to output_dir:
+          <run>-<phase>.pstats           full profile (python -m pstats <file>, or snakeviz)
+          <run>-<phase>-functions.csv    top_n functions by cumulative time
+          <run>-<phase>-allocations.csv  top_n allocation sites by memory still held
+
+        Threads started during a phase (fetch, writer) are profiled too. Parse
+        workers are separate processes the profiler cannot see, so profiled
+        runs parse in-process instead (NewsScraper(parse_workers=0), as
+        main.py --profile does) and BeautifulSoup/lxml time shows up here.
+        """
+        self.run_name = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{run_name}"
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self.enabled = enabled
+        self.reports: List[str] = []
+        self._thread_profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def _profile_thread(self, frame, event, arg):
+        """threading.setprofile hook: hand the new thread its own profiler"""
+        profile = cProfile.Profile()
+        with self._lock:
+            self._thread_profiles.append(profile)
+        profile.enable()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Profile the with-block as one phase (a no-op when profiling is off)"""
+        if not self.enabled:
+            yield
+            return
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(TRACEBACK_FRAMES)
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+
+        with self._lock:
+            self._thread_profiles = []
+        profile = cProfile.Profile()
+        threading.setprofile(self._profile_thread)
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            threading.setprofile(None)
+            after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+            try:
+                self.write_reports(name, profile, before, after, peak)
+            except Exception as e:
+                logger.error(f"Error writing profile for phase {name}: {e}")
+
+    def write_reports(self, name: str, profile: cProfile.Profile, before: tracemalloc.Snapshot,
+                      after: tracemalloc.Snapshot, peak: int):
+        """Save the phase's profile and its top functions and allocation sites"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        prefix = os.path.join(self.output_dir, f"{self.run_name}-{name}")
+
+        stats = pstats.Stats(profile)
+        with self._lock:
+            thread_profiles = list(self._thread_profiles)
+        for thread_profile in thread_profiles:
+            try:
+                stats.add(thread_profile)
+            except TypeError:
+                # A thread that never made a call leaves an empty profile
+                pass
+        stats.dump_stats(f"{prefix}.pstats")
+
+        with open(f"{prefix}-functions.csv", 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['function', 'file', 'line', 'calls', 'primitive_calls', 'total_seconds', 'cumulative_seconds'])
+            ranked = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+            for (filename, line, function), (primitive, calls, total, cumulative, _) in ranked[:self.top_n]:
+                writer.writerow([function, filename, line, calls, primitive, f"{total:.6f}", f"{cumulative:.6f}"])
+
+        differences = after.compare_to(before, 'lineno')
+        with open(f"{prefix}-allocations.csv", 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['file', 'line', 'size_kb', 'size_change_kb', 'blocks', 'blocks_change'])
+            for difference in differences[:self.top_n]:
+                frame = difference.traceback[0]
+                writer.writerow([frame.filename, frame.lineno, f"{difference.size / 1024:.1f}",
+                                 f"{difference.size_diff / 1024:.1f}", difference.count, difference.count_diff])
+
+        self.reports.append(prefix)
+        self.print_summary(name, stats, differences, peak, prefix)
+
+    def print_summary(self, name: str, stats: pstats.Stats, differences: list, peak: int, prefix: str, lines: int = 10):
+        """Hottest functions (own time) and largest allocation sites of a phase"""
+        print(f"\nProfile: {name} (peak traced memory {peak / (1024 * 1024):.1f} MB, {len(self._thread_profiles)} threads)")
+        print("-" * 70)
+        ranked = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+        for (filename, line, function), (_, calls, total, cumulative, _) in ranked[:lines]:
+            print(f"  {total:8.3f}s own {cumulative:8.3f}s cum {calls:>9} calls  {function} ({os.path.basename(filename)}:{line})")
+        print("  Allocations still held:")
+        for difference in differences[:5]:
+            frame = difference.traceback[0]
+            print(f"  {difference.size_diff / 1024:+10.1f} KB  {os.path.basename(frame.filename)}:{frame.lineno}")
+        print(f"  Reports: {prefix}.pstats, -functions.csv, -allocations.csv")
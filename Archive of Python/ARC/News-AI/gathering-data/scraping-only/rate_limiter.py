@@ -0,0 +1,136 @@
+# rate_limiter.py
+import random
+import threading
+import time
+import logging
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+from urllib.robotparser import RobotFileParser
+
+logger = logging.getLogger(__name__)
+
+# Requests per second a host starts at, and the range the adaptive rate moves in
+DEFAULT_RATE = 1.0
+DEFAULT_MAX_RATE = 8.0
+DEFAULT_MIN_RATE = 0.05
+DEFAULT_BURST = 2.0
+# Additive increase per normal response, multiplicative decrease per throttle/error
+RATE_INCREASE = 0.1
+RATE_DECREASE = 0.5
+# Pause after consecutive failures without a Retry-After: 1s, 2s, 4s ... capped
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 300.0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def robots_rate_ceiling(robots_txt: str, user_agent: str = '*') -> Optional[float]:
+    """Highest request rate robots.txt allows (from Crawl-delay / Request-rate), if it sets one"""
+    parser = RobotFileParser()
+    parser.parse(robots_txt.splitlines())
+    # crawl_delay()/request_rate() answer None until the parser counts as fetched
+    parser.modified()
+
+    ceilings: List[float] = []
+    delay = parser.crawl_delay(user_agent)
+    if delay:
+        ceilings.append(1.0 / float(delay))
+    request_rate = parser.request_rate(user_agent)
+    if request_rate and request_rate.seconds:
+        ceilings.append(request_rate.requests / request_rate.seconds)
+    return min(ceilings) if ceilings else None
+
+
+class HostRateLimiter:
+    def __init__(self, rate: float = DEFAULT_RATE, max_rate: float = DEFAULT_MAX_RATE,
+                 min_rate: float = DEFAULT_MIN_RATE, burst: float = DEFAULT_BURST):
+        """
+        Token bucket for one host. Tokens refill at `rate` per second up to
+        `burst` and every request takes one. The rate adapts (AIMD): it creeps
+        up toward max_rate while the host answers normally and halves on
+        429/503/5xx or connection errors, which also pause the host for the
+        Retry-After time or an exponential backoff.
+        """
+        self.max_rate = max(float(max_rate), DEFAULT_MIN_RATE)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.rate = min(max(float(rate), self.min_rate), self.max_rate)
+        self.burst = max(1.0, float(burst))
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._failures = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, rate_limit: Optional[Dict] = None, request_delay: Optional[float] = None) -> 'HostRateLimiter':
+        """Limiter from a source's 'rate_limit' settings; request_delay seeds the starting rate"""
+        settings = dict(rate_limit or {})
+        if 'rate' not in settings and request_delay:
+            settings['rate'] = 1.0 / request_delay
+        # A configured starting rate is never above the ceiling it adapts under
+        if 'rate' in settings:
+            settings.setdefault('max_rate', max(DEFAULT_MAX_RATE, settings['rate']))
+        settings.pop('respect_robots', None)
+        return cls(**settings)
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Block until the host's budget allows one more request"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    if self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        return
+                    wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def set_ceiling(self, max_rate: float):
+        """Cap the rate, e.g. at what robots.txt allows"""
+        with self._lock:
+            self.max_rate = max(min(self.max_rate, max_rate), 1e-6)
+            self.min_rate = min(self.min_rate, self.max_rate)
+            self.rate = min(self.rate, self.max_rate)
+
+    def on_success(self):
+        """The host answered normally: speed up a little"""
+        with self._lock:
+            self._failures = 0
+            self.rate = min(self.max_rate, self.rate + RATE_INCREASE)
+
+    def on_failure(self, retry_after: Optional[float] = None) -> float:
+        """The host throttled or failed: slow down and pause; returns the pause in seconds"""
+        with self._lock:
+            self._failures += 1
+            self.rate = max(self.min_rate, self.rate * RATE_DECREASE)
+            if retry_after is None:
+                backoff = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (self._failures - 1))
+                retry_after = backoff * random.uniform(0.8, 1.2)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            # One request may go as soon as the pause is over, then the (lower) rate applies
+            self._tokens = 1.0
+            self._updated = self._blocked_until
+            return retry_after
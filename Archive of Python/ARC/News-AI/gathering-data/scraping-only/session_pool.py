@@ -0,0 +1,80 @@
+# session_pool.py
+import requests
+import threading
+import logging
+from typing import Dict, Optional
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+
+def host_of(url: str) -> str:
+    """Return the lower-cased host part of a URL"""
+    return urlparse(url).netloc.lower()
+
+
+class SessionPool:
+    def __init__(self, pool_maxsize: int = 4, retries: int = 3, backoff_factor: float = 0.5):
+        """
+        One keep-alive requests.Session per host, so repeated requests to the
+        same source reuse TCP/TLS connections instead of handshaking each time
+        """
+        self.pool_maxsize = pool_maxsize
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def build_session(self, pool_maxsize: int) -> requests.Session:
+        """Create a session with a bounded connection pool and retry adapter"""
+        # Only connection-level failures are retried here; throttling and 5xx
+        # responses go back to the fetch engine's per-host rate limiter
+        retry = Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=self.retries,
+            status=0,
+            backoff_factor=self.backoff_factor,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry, pool_block=True)
+
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def configure_host(self, url: str, pool_maxsize: Optional[int] = None) -> requests.Session:
+        """Create the session for the host of `url` with its own pool size"""
+        session = self.build_session(pool_maxsize or self.pool_maxsize)
+        with self._lock:
+            previous = self._sessions.get(host_of(url))
+            self._sessions[host_of(url)] = session
+        if previous is not None:
+            previous.close()
+        return session
+
+    def session_for(self, url: str) -> requests.Session:
+        """Get (or lazily create) the session for the host of `url`"""
+        host = host_of(url)
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = self.build_session(self.pool_maxsize)
+                self._sessions[host] = session
+            return session
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET through the host's pooled session"""
+        return self.session_for(url).get(url, **kwargs)
+
+    def close(self):
+        """Close every pooled connection"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()